@@ -5,10 +5,10 @@ A Python package for monitoring GitHub repositories and generating
 enhanced JSON reports with intelligent analysis and DWS IQ suitability assessment.
 """
 
-from .monitor import AP2Monitor, RepositoryData
+from .monitor import AP2Monitor, RepositoryData, RuleEngine, SQLiteStorage
 
 __version__ = "0.13"
 __author__ = "AP2 Team"
 __email__ = "ap2@example.com"
 
-__all__ = ["AP2Monitor", "RepositoryData"]
\ No newline at end of file
+__all__ = ["AP2Monitor", "RepositoryData", "RuleEngine", "SQLiteStorage"]
\ No newline at end of file
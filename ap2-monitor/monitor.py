@@ -1,17 +1,43 @@
+import argparse
+import bisect
+import hashlib
 import json
+import multiprocessing
 import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
-from dataclasses import dataclass, field
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass, field
+from urllib.parse import parse_qs, urlsplit
 
 import pandas as pd
 
 try:
     from github import Github
-    from github.GithubException import GithubException
+    from github.GithubException import GithubException, RateLimitExceededException
 except ImportError:  # pragma: no cover
     Github = None  # type: ignore
     GithubException = Exception  # type: ignore
+    RateLimitExceededException = Exception  # type: ignore
+
+try:
+    import pyarrow
+    import pyarrow as pa
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None  # type: ignore
+    pa = None  # type: ignore
 
 
 AI_TOPICS = [
@@ -64,6 +90,12 @@ DWS_KEYWORDS = [
     'analytics', 'monitoring', 'cloud', 'enterprise', 'platform'
 ]
 
+DWS_LANGUAGES = ['Python', 'Go', 'JavaScript', 'TypeScript', 'C#', 'Java']
+
+AP2_KEYWORDS = [
+    'agent payments protocol', 'ap2', 'agent2agent', 'a2a', 'agent-to-agent'
+]
+
 DEFAULT_KEYWORDS = sorted({
     *AI_TOPICS,
     *CLOUD_TOPICS,
@@ -72,6 +104,65 @@ DEFAULT_KEYWORDS = sorted({
     *DWS_KEYWORDS,
 })
 
+QUERY_CACHE_SIZE = 256
+
+REPORT_FORMATS = ("json", "excel")
+SUPPORTED_REPORT_FORMATS = ("json", "ndjson", "excel", "parquet", "feather")
+COLUMNAR_COMPRESSION = "zstd"
+
+CHECKPOINT_PAGE_SIZE = 30  # GitHub search results per page
+CHECKPOINT_VERSION = 1
+KEYWORD_MAX_ATTEMPTS = 3
+
+WORK_QUEUE_LEASE_SECONDS = 900
+WORK_QUEUE_MAX_ATTEMPTS = 3
+WORK_QUEUE_POLL_SECONDS = 1.0
+WORK_QUEUE_RATE_LIMIT_WAIT = 60
+WORK_QUEUE_RATE_LIMIT_MAX_WAIT = 900
+
+ENRICHMENT_WORKERS = 8
+README_MAX_CHARS = 20000
+RECENT_ACTIVITY_DAYS = 90
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "explanation": {
+        "max_items": 2,
+        "fallback": "general-purpose repository with standard development practices",
+        "rules": [
+            {"name": "ai_topics", "when": {"topics_any": AI_TOPICS},
+             "text": "AI/ML capabilities for intelligent applications"},
+            {"name": "cloud_topics", "when": {"topics_any": CLOUD_TOPICS},
+             "text": "cloud-native technologies suitable for modern infrastructure"},
+            {"name": "web_topics", "when": {"topics_any": WEB_TOPICS},
+             "text": "web development focused with modern frameworks"},
+            {"name": "language_insight", "insights": LANGUAGE_INSIGHTS,
+             "text": "{language} - {insight}"},
+            {"name": "stars_high", "group": "popularity", "when": {"min_stars": 1001},
+             "text": "highly popular with strong community adoption"},
+            {"name": "stars_growing", "group": "popularity", "when": {"min_stars": 101},
+             "text": "growing popularity with active community"},
+            {"name": "forks_high", "group": "forking", "when": {"min_forks": 501},
+             "text": "actively forked indicating collaborative development"},
+            {"name": "forks_moderate", "group": "forking", "when": {"min_forks": 51},
+             "text": "moderate forking activity showing developer interest"},
+        ],
+    },
+    "suitability": {
+        "min_criteria": 2,
+        "rules": [
+            {"name": "dws_language", "when": {"language_in": DWS_LANGUAGES}},
+            {"name": "dws_topics", "when": {"topics_any": DWS_RELEVANT_TOPICS}},
+            {"name": "quality", "when": {"min_stars": 10, "min_rating": 3}},
+            {"name": "dws_keywords", "when": {"description_any": DWS_KEYWORDS}},
+            {"name": "ap2_readme", "when": {"readme_any": AP2_KEYWORDS}},
+            {"name": "recently_active", "when": {"pushed_within_days": RECENT_ACTIVITY_DAYS}},
+        ],
+    },
+}
+
+STAR_GROWTH_WINDOW_DAYS = 30
+STAR_GROWTH_BONUS_RATE = 10.0  # stars per day that earn one extra rating point
+
 
 @dataclass
 class RepositoryData:
@@ -83,13 +174,542 @@ class RepositoryData:
     language: str = ""
     stars: int = 0
     forks: int = 0
+    readme: str = ""
+    pushed_at: Optional[datetime] = None
+    open_issues: int = 0
+    head_sha: str = ""
+
+
+@dataclass
+class EnrichmentData:
+    head_sha: str
+    readme: str = ""
+    pushed_at: Optional[datetime] = None
+    open_issues: Optional[int] = None
+
+
+class RuleConfigError(ValueError):
+    """Raised when a rule configuration cannot be compiled."""
+
+
+class _RepoFeatures:
+    """Per-repository values shared by every rule during one evaluation."""
+
+    __slots__ = ("language", "topic_mask", "description", "readme", "days_since_push",
+                 "stars", "forks", "rating", "open_issues")
+
+    def __init__(self, repo: RepositoryData, topic_bits: Dict[str, int]):
+        self.language = repo.language
+        mask = 0
+        for topic in repo.topics:
+            mask |= topic_bits.get(topic.lower(), 0)
+        self.topic_mask = mask
+        self.description = repo.description.lower() if repo.description else ""
+        self.readme = repo.readme.lower() if repo.readme else ""
+        self.days_since_push: Optional[int] = None
+        if repo.pushed_at is not None:
+            pushed_at = repo.pushed_at
+            if pushed_at.tzinfo is None:
+                pushed_at = pushed_at.replace(tzinfo=timezone.utc)
+            self.days_since_push = (datetime.now(timezone.utc) - pushed_at).days
+        self.stars = repo.stars
+        self.forks = repo.forks
+        self.rating = repo.rating
+        self.open_issues = repo.open_issues
+
+
+class _CompiledRule:
+    __slots__ = ("index", "name", "group", "text", "insights", "checks", "cost")
+
+    def __init__(self, index: int, name: str, checks: List[Tuple[int, Callable[[_RepoFeatures], bool]]],
+                 group: Optional[str] = None, text: str = "", insights: Optional[Dict[str, str]] = None):
+        checks = sorted(checks, key=lambda check: check[0])
+        self.index = index
+        self.name = name
+        self.group = group
+        self.text = text
+        self.insights = insights
+        self.checks = tuple(check for _, check in checks)
+        self.cost = sum(cost for cost, _ in checks)
+
+    def matches(self, features: _RepoFeatures) -> bool:
+        for check in self.checks:
+            if not check(features):
+                return False
+        return True
+
+    def render(self, features: _RepoFeatures) -> str:
+        if self.insights is None:
+            return self.text
+        return self.text.format(language=features.language, insight=self.insights[features.language])
+
+
+class RuleEngine:
+    """Explanation and DWS IQ suitability rules compiled from configuration.
+
+    Topic lists become bits in a shared mask, language lists become frozensets and
+    description keywords a single regular expression, so each repository is
+    normalized once and every rule is a handful of integer and set operations.
+    Suitability rules are evaluated cheapest first and stop as soon as the outcome
+    is decided; per-rule statistics therefore count evaluations as well as hits.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        explanation = config.get("explanation", DEFAULT_RULES["explanation"])
+        suitability = config.get("suitability", DEFAULT_RULES["suitability"])
+
+        self._topic_bits: Dict[str, int] = {}
+        self.max_items = int(explanation.get("max_items", 2))
+        self.fallback = explanation.get("fallback", DEFAULT_RULES["explanation"]["fallback"])
+        self.min_criteria = int(suitability.get("min_criteria", 2))
+
+        self.explanation_rules = [
+            self._compile(index, rule, with_text=True)
+            for index, rule in enumerate(explanation.get("rules", []))
+        ]
+        offset = len(self.explanation_rules)
+        self.suitability_rules = sorted(
+            (self._compile(offset + index, rule, with_text=False)
+             for index, rule in enumerate(suitability.get("rules", []))),
+            key=lambda rule: rule.cost,
+        )
+        self._evaluated = [0] * (offset + len(self.suitability_rules))
+        self._hits = [0] * len(self._evaluated)
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleEngine":
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                config = json.load(f)
+            except json.JSONDecodeError as exc:
+                raise RuleConfigError(f"Invalid rule file '{path}': {exc}")
+        return cls(config)
+
+    def _compile(self, index: int, rule: Dict[str, Any], with_text: bool) -> _CompiledRule:
+        name = rule.get("name") or f"rule_{index}"
+        when = dict(rule.get("when", {}))
+        insights = rule.get("insights")
+        if insights is not None:
+            when.setdefault("language_in", list(insights))
+        if not when:
+            raise RuleConfigError(f"Rule '{name}' has no conditions")
+
+        checks = [self._compile_condition(name, key, value) for key, value in when.items()]
+        if with_text:
+            if "text" not in rule:
+                raise RuleConfigError(f"Explanation rule '{name}' has no text")
+            return _CompiledRule(index, name, checks, group=rule.get("group"),
+                                 text=rule["text"], insights=insights)
+        return _CompiledRule(index, name, checks)
+
+    def _compile_condition(self, name: str, key: str, value: Any) -> Tuple[int, Callable[[_RepoFeatures], bool]]:
+        if key in ("min_stars", "min_forks", "min_rating"):
+            threshold = int(value)
+            attribute = key[len("min_"):]
+            return 0, lambda f: getattr(f, attribute) >= threshold
+        if key == "max_open_issues":
+            limit = int(value)
+            return 0, lambda f: f.open_issues <= limit
+        if key == "pushed_within_days":
+            days = int(value)
+            return 0, lambda f: f.days_since_push is not None and f.days_since_push <= days
+        if key == "language_in":
+            languages = frozenset(value)
+            return 1, lambda f: f.language in languages
+        if key == "topics_any":
+            mask = 0
+            for topic in value:
+                topic = str(topic).lower()
+                if topic not in self._topic_bits:
+                    self._topic_bits[topic] = 1 << len(self._topic_bits)
+                mask |= self._topic_bits[topic]
+            return 1, lambda f: bool(f.topic_mask & mask)
+        if key in ("description_any", "readme_any"):
+            keywords = sorted({str(keyword).lower() for keyword in value}, key=len, reverse=True)
+            if not keywords:
+                return 0, lambda f: False
+            pattern = "|".join(re.escape(keyword) for keyword in keywords)
+            attribute = key[:-len("_any")]
+            if attribute == "readme":
+                # README text is long and full of URLs and hashes; match whole words only.
+                pattern = rf"\b(?:{pattern})\b"
+            pattern = re.compile(pattern)
+            cost = 2 if attribute == "description" else 3
+            return cost, lambda f: pattern.search(getattr(f, attribute)) is not None
+        raise RuleConfigError(f"Rule '{name}' uses unknown condition '{key}'")
+
+    def _features(self, repo: RepositoryData) -> _RepoFeatures:
+        return _RepoFeatures(repo, self._topic_bits)
+
+    def _check(self, rule: _CompiledRule, features: _RepoFeatures) -> bool:
+        self._evaluated[rule.index] += 1
+        if rule.matches(features):
+            self._hits[rule.index] += 1
+            return True
+        return False
+
+    def explain(self, repo: RepositoryData) -> str:
+        features = self._features(repo)
+        explanations: List[str] = []
+        matched_groups: Set[str] = set()
+        for rule in self.explanation_rules:
+            if len(explanations) >= self.max_items:
+                break
+            if rule.group is not None and rule.group in matched_groups:
+                continue
+            if self._check(rule, features):
+                explanations.append(rule.render(features))
+                if rule.group is not None:
+                    matched_groups.add(rule.group)
+        return ". ".join(explanations) if explanations else self.fallback
+
+    def is_suitable(self, repo: RepositoryData) -> bool:
+        needed = self.min_criteria
+        if needed <= 0:
+            return True
+        features = self._features(repo)
+        remaining = len(self.suitability_rules)
+        for rule in self.suitability_rules:
+            remaining -= 1
+            if self._check(rule, features):
+                needed -= 1
+                if needed == 0:
+                    return True
+            elif needed > remaining:
+                return False
+        return False
+
+    def statistics(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Per-rule ``evaluated``/``hits`` counters since creation or the last reset."""
+        def collect(rules: List[_CompiledRule]) -> Dict[str, Dict[str, int]]:
+            return {
+                rule.name: {"evaluated": self._evaluated[rule.index], "hits": self._hits[rule.index]}
+                for rule in rules
+            }
+        return {
+            "explanation": collect(self.explanation_rules),
+            "suitability": collect(self.suitability_rules),
+        }
+
+    def reset_statistics(self) -> None:
+        self._evaluated = [0] * len(self._evaluated)
+        self._hits = [0] * len(self._hits)
+
+
+class SQLiteStorage:
+    """Durable SQLite store for repositories and per-sweep star/fork observations.
+
+    Uses WAL journaling so readers (e.g. the query API) are not blocked while a
+    sweep is written, and records each sweep in a single transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS repositories (
+            url TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            topics TEXT NOT NULL DEFAULT '[]',
+            language TEXT NOT NULL DEFAULT '',
+            rating INTEGER NOT NULL,
+            stars INTEGER NOT NULL DEFAULT 0,
+            forks INTEGER NOT NULL DEFAULT 0,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_repositories_rating ON repositories (rating DESC);
+        CREATE INDEX IF NOT EXISTS idx_repositories_language ON repositories (language);
+
+        CREATE TABLE IF NOT EXISTS sweeps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            observed_at TEXT NOT NULL,
+            repository_count INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS observations (
+            url TEXT NOT NULL REFERENCES repositories (url),
+            observed_at TEXT NOT NULL,
+            sweep_id INTEGER NOT NULL REFERENCES sweeps (id),
+            stars INTEGER NOT NULL,
+            forks INTEGER NOT NULL,
+            PRIMARY KEY (url, observed_at)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_observations_observed_at ON observations (observed_at);
+
+        CREATE TABLE IF NOT EXISTS enrichment (
+            url TEXT PRIMARY KEY,
+            head_sha TEXT NOT NULL,
+            readme TEXT NOT NULL DEFAULT '',
+            pushed_at TEXT,
+            open_issues INTEGER
+        );
+    """
+
+    def __init__(self, path: str = "ap2_monitor.db"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def _timestamp(moment: Optional[datetime] = None) -> str:
+        moment = moment or datetime.now(timezone.utc)
+        return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+    def record_sweep(self, repositories: List[RepositoryData], observed_at: Optional[datetime] = None) -> int:
+        """Upsert repositories and store one observation each, atomically. Returns the sweep id."""
+        timestamp = self._timestamp(observed_at)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO sweeps (observed_at, repository_count) VALUES (?, ?)",
+                (timestamp, len(repositories)),
+            )
+            sweep_id = cursor.lastrowid
+            self.connection.executemany(
+                """
+                INSERT INTO repositories
+                    (url, name, description, topics, language, rating, stars, forks, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    name = excluded.name,
+                    description = excluded.description,
+                    topics = excluded.topics,
+                    language = excluded.language,
+                    rating = excluded.rating,
+                    stars = excluded.stars,
+                    forks = excluded.forks,
+                    last_seen = excluded.last_seen
+                """,
+                [
+                    (repo.url, repo.name, repo.description, json.dumps(repo.topics), repo.language,
+                     repo.rating, repo.stars, repo.forks, timestamp, timestamp)
+                    for repo in repositories
+                ],
+            )
+            self.connection.executemany(
+                """
+                INSERT INTO observations (url, observed_at, sweep_id, stars, forks)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url, observed_at) DO UPDATE SET
+                    sweep_id = excluded.sweep_id,
+                    stars = excluded.stars,
+                    forks = excluded.forks
+                """,
+                [(repo.url, timestamp, sweep_id, repo.stars, repo.forks) for repo in repositories],
+            )
+        return sweep_id
+
+    def load_repositories(self, min_rating: Optional[int] = None) -> List[RepositoryData]:
+        query = "SELECT name, rating, url, description, topics, language, stars, forks FROM repositories"
+        args: Tuple[Any, ...] = ()
+        if min_rating is not None:
+            query += " WHERE rating >= ?"
+            args = (min_rating,)
+        query += " ORDER BY rating DESC, url"
+        return [
+            RepositoryData(
+                name=name, rating=rating, url=url, description=description,
+                topics=json.loads(topics), language=language, stars=stars, forks=forks,
+            )
+            for name, rating, url, description, topics, language, stars, forks
+            in self.connection.execute(query, args)
+        ]
+
+    def star_history(self, url: str) -> List[Tuple[str, int, int]]:
+        """Return ``(observed_at, stars, forks)`` rows for a repository, oldest first."""
+        return list(self.connection.execute(
+            "SELECT observed_at, stars, forks FROM observations WHERE url = ? ORDER BY observed_at",
+            (url,),
+        ))
+
+    def save_enrichment(self, enrichment: Dict[str, EnrichmentData]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO enrichment (url, head_sha, readme, pushed_at, open_issues)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    head_sha = excluded.head_sha,
+                    readme = excluded.readme,
+                    pushed_at = excluded.pushed_at,
+                    open_issues = excluded.open_issues
+                """,
+                [
+                    (url, data.head_sha, data.readme,
+                     data.pushed_at.isoformat() if data.pushed_at else None, data.open_issues)
+                    for url, data in enrichment.items()
+                ],
+            )
+
+    def load_enrichment(self) -> Dict[str, EnrichmentData]:
+        return {
+            url: EnrichmentData(
+                head_sha=head_sha, readme=readme,
+                pushed_at=datetime.fromisoformat(pushed_at) if pushed_at else None,
+                open_issues=open_issues,
+            )
+            for url, head_sha, readme, pushed_at, open_issues in self.connection.execute(
+                "SELECT url, head_sha, readme, pushed_at, open_issues FROM enrichment"
+            )
+        }
+
+    def star_growth_rates(self, days: int = STAR_GROWTH_WINDOW_DAYS,
+                          now: Optional[datetime] = None) -> Dict[str, float]:
+        """Stars gained per day between each repository's first and last observation in the window."""
+        since = self._timestamp((now or datetime.now(timezone.utc)) - timedelta(days=days))
+        rows = self.connection.execute(
+            """
+            WITH bounds AS (
+                SELECT url, MIN(observed_at) AS first_at, MAX(observed_at) AS last_at
+                FROM observations
+                WHERE observed_at >= ?
+                GROUP BY url
+                HAVING COUNT(*) > 1
+            )
+            SELECT bounds.url,
+                   (last.stars - first.stars) / (julianday(bounds.last_at) - julianday(bounds.first_at))
+            FROM bounds
+            JOIN observations AS first ON first.url = bounds.url AND first.observed_at = bounds.first_at
+            JOIN observations AS last ON last.url = bounds.url AND last.observed_at = bounds.last_at
+            """,
+            (since,),
+        )
+        return {url: rate for url, rate in rows}
+
+
+class SweepCheckpoint:
+    """Progress of a keyword sweep, persisted atomically as JSON.
+
+    Records the completed keywords, keywords given up on after repeated errors
+    (with their attempt counts), the number of results already processed for the
+    keyword in progress, and every repository fetched so far in the sweep.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.keywords: List[str] = []
+        self.per_keyword_limit = 0
+        self.completed_keywords: List[str] = []
+        self.failed_keywords: List[str] = []
+        self.keyword_attempts: Dict[str, int] = {}
+        self.current_keyword: Optional[str] = None
+        self.current_offset = 0
+        self.repositories: List[RepositoryData] = []
+
+    def start(self, keywords: List[str], per_keyword_limit: int) -> None:
+        self.keywords = list(keywords)
+        self.per_keyword_limit = per_keyword_limit
+        self.completed_keywords = []
+        self.failed_keywords = []
+        self.keyword_attempts = {}
+        self.current_keyword = None
+        self.current_offset = 0
+        self.repositories = []
+
+    def load(self) -> bool:
+        """Load the checkpoint file; returns False when there is none."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in '{self.path}'")
+        self.keywords = state["keywords"]
+        self.per_keyword_limit = state["per_keyword_limit"]
+        self.completed_keywords = state["completed_keywords"]
+        self.failed_keywords = state.get("failed_keywords", [])
+        self.keyword_attempts = state.get("keyword_attempts", {})
+        self.current_keyword = state["current_keyword"]
+        self.current_offset = state["current_offset"]
+        self.repositories = [_repository_from_dict(data) for data in state["repositories"]]
+        return True
+
+    def offset_for(self, keyword: str) -> int:
+        return self.current_offset if keyword == self.current_keyword else 0
+
+    def save(self) -> None:
+        """Write the checkpoint to a temporary file and atomically replace the old one."""
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "keywords": self.keywords,
+            "per_keyword_limit": self.per_keyword_limit,
+            "completed_keywords": self.completed_keywords,
+            "failed_keywords": self.failed_keywords,
+            "keyword_attempts": self.keyword_attempts,
+            "current_keyword": self.current_keyword,
+            "current_offset": self.current_offset,
+            "repositories": [asdict(repo) for repo in self.repositories],
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, default=_json_default, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _repository_from_dict(data: Dict[str, Any]) -> RepositoryData:
+    data = dict(data)
+    if isinstance(data.get("pushed_at"), str):
+        data["pushed_at"] = datetime.fromisoformat(data["pushed_at"])
+    return RepositoryData(**data)
+
+
+class GitHubEnrichmentSource:
+    """Fetches README signals for a repository from the GitHub API.
+
+    Activity (last push, open issues) already arrives with the search results, so
+    only the README is requested, and only when the head SHA has changed. Any object with the same ``head_sha``/``fetch`` methods can be passed to
+    ``AP2Monitor`` instead, e.g. a local stub in tests.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def head_sha(self, full_name: str) -> str:
+        repo = self.client.get_repo(full_name, lazy=True)
+        return repo.get_commits()[0].sha
+
+    def fetch(self, full_name: str, head_sha: str) -> EnrichmentData:
+        repo = self.client.get_repo(full_name, lazy=True)
+        try:
+            readme = repo.get_readme().decoded_content.decode("utf-8", errors="replace")
+        except GithubException:
+            readme = ""
+        return EnrichmentData(head_sha=head_sha, readme=readme[:README_MAX_CHARS])
 
 
 class AP2Monitor:
     """AP2 Repository Monitoring Agent"""
 
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(self, github_token: Optional[str] = None, storage: Optional[SQLiteStorage] = None,
+                 rules: Optional[RuleEngine] = None, enrichment_source: Optional[Any] = None):
         self.repositories: List[RepositoryData] = []
+        self.storage = storage
+        self.enrichment_source = enrichment_source
+        self._enrichment_cache: Dict[str, EnrichmentData] = storage.load_enrichment() if storage else {}
+        if rules is None:
+            rules_path = os.getenv("AP2_RULES_FILE")
+            rules = RuleEngine.from_file(rules_path) if rules_path else RuleEngine()
+        self.rules = rules
+        self._generation = 0
+        self._query_index: Optional["RepositoryIndex"] = None
         self.github_token = github_token or os.getenv("AP2_GITHUB_TOKEN")
         self.github_client = None
         if Github:
@@ -105,41 +725,189 @@ class AP2Monitor:
     def add_repository(self, repo_data: RepositoryData) -> None:
         """Add a repository to be monitored."""
         self.repositories.append(repo_data)
+        self._generation += 1
 
-    def fetch_repositories(self, keywords: Optional[List[str]] = None, per_keyword_limit: int = 10) -> None:
-        """Fetch repositories from GitHub matching the provided keywords."""
+    def fetch_repositories(self, keywords: Optional[List[str]] = None, per_keyword_limit: int = 10,
+                           checkpoint_path: Optional[str] = None, resume: bool = False) -> List[str]:
+        """Fetch repositories from GitHub matching the provided keywords.
+
+        With ``checkpoint_path`` the sweep's progress is saved after every page of
+        results and every keyword; ``resume=True`` continues from that checkpoint.
+        A rate limit stops the sweep so the remaining keywords are not attempted.
+        Other API errors are retried up to ``KEYWORD_MAX_ATTEMPTS`` times, after which
+        the keyword is skipped (and recorded as failed in the checkpoint) so the sweep
+        can still finish. Returns the unfinished keywords;
+        the checkpoint is removed (and the sweep recorded in storage) only when this
+        list is empty, otherwise it is kept for a resumed sweep to retry them.
+        """
         if not Github:
             raise RuntimeError("PyGithub is required to use GitHub search. Install dependencies.")
         if not self.github_client:
             raise RuntimeError("GitHub client is not initialized. Provide a token or ensure PyGithub is installed.")
 
         keywords = keywords or DEFAULT_KEYWORDS
+        checkpoint = SweepCheckpoint(checkpoint_path) if checkpoint_path else None
+        if checkpoint and not (resume and checkpoint.load()):
+            checkpoint.start(keywords, per_keyword_limit)
+        if checkpoint and (checkpoint.keywords != list(keywords)
+                           or checkpoint.per_keyword_limit != per_keyword_limit):
+            raise ValueError(f"Checkpoint '{checkpoint_path}' belongs to a different keyword sweep")
+
         seen_urls = {repo.url for repo in self.repositories}
+        if checkpoint:
+            for repo_data in checkpoint.repositories:
+                if repo_data.url not in seen_urls:
+                    self.add_repository(repo_data)
+                    seen_urls.add(repo_data.url)
+        completed = set(checkpoint.completed_keywords + checkpoint.failed_keywords) if checkpoint else set()
+        attempts = checkpoint.keyword_attempts if checkpoint else {}
+        growth_rates = self.storage.star_growth_rates() if self.storage else {}
+        unfinished: List[str] = []
+        failed: List[str] = []
 
-        for keyword in keywords:
-            try:
-                query = f"{keyword} in:name,description,topics"
-                search_results = self.github_client.search_repositories(query=query, sort="stars", order="desc")
-                for repo in search_results[:per_keyword_limit]:
-                    url = repo.html_url
-                    if url in seen_urls:
-                        continue
-
-                    topics = list(self._extract_topics_from_source(repo))
-                    repo_data = RepositoryData(
-                        name=repo.full_name,
-                        rating=min(5, max(1, int(repo.stargazers_count / 500) + 1)),
-                        url=url,
-                        description=repo.description or "",
-                        topics=topics,
-                        language=repo.language or "",
-                        stars=repo.stargazers_count,
-                        forks=repo.forks_count,
-                    )
+        def collect(keyword: str) -> None:
+            offset = checkpoint.offset_for(keyword) if checkpoint else 0
+            for position, repo in self._search_keyword(keyword, per_keyword_limit, offset):
+                url = repo.html_url
+                if url not in seen_urls:
+                    repo_data = self._repository_from_source(repo, growth_rates.get(url, 0.0))
                     self.add_repository(repo_data)
                     seen_urls.add(url)
-            except GithubException as exc:  # pragma: no cover
-                print(f"GitHub API error for keyword '{keyword}': {exc}")
+                    if checkpoint:
+                        checkpoint.repositories.append(repo_data)
+
+                if checkpoint and position % CHECKPOINT_PAGE_SIZE == 0:
+                    checkpoint.current_keyword = keyword
+                    checkpoint.current_offset = position
+                    checkpoint.save()
+
+        for index, keyword in enumerate(keywords):
+            if keyword in completed:
+                continue
+            gave_up = False
+            try:
+                while True:
+                    try:
+                        collect(keyword)
+                        break
+                    except RateLimitExceededException:
+                        raise
+                    except GithubException as exc:
+                        attempts[keyword] = attempts.get(keyword, 0) + 1
+                        print(f"GitHub API error for keyword '{keyword}' "
+                              f"(attempt {attempts[keyword]}/{KEYWORD_MAX_ATTEMPTS}): {exc}")
+                        if attempts[keyword] >= KEYWORD_MAX_ATTEMPTS:
+                            gave_up = True
+                            break
+                        if checkpoint:
+                            checkpoint.save()
+            except RateLimitExceededException as exc:
+                print(f"GitHub rate limit reached at keyword '{keyword}', stopping sweep: {exc}")
+                unfinished.extend(k for k in keywords[index:] if k not in completed)
+                break
+
+            if gave_up:
+                failed.append(keyword)
+            if checkpoint:
+                (checkpoint.failed_keywords if gave_up else checkpoint.completed_keywords).append(keyword)
+                checkpoint.current_keyword = None
+                checkpoint.current_offset = 0
+                checkpoint.save()
+
+        if checkpoint:
+            failed = checkpoint.failed_keywords
+        if failed:
+            print(f"Skipped {len(failed)} keyword(s) after {KEYWORD_MAX_ATTEMPTS} failed attempts: "
+                  f"{', '.join(failed)}")
+
+        if checkpoint and unfinished:
+            print(f"Sweep incomplete ({len(unfinished)} keyword(s) unfinished); "
+                  f"resume from checkpoint '{checkpoint_path}'")
+            return unfinished
+
+        if self.storage:
+            self.storage.record_sweep(self.repositories)
+        if checkpoint:
+            checkpoint.clear()
+        return unfinished
+
+    def _search_keyword(self, keyword: str, per_keyword_limit: int, offset: int = 0,
+                        search_window: Optional[str] = None) -> Any:
+        """Yield ``(position, repo)`` search results, with 1-based positions after ``offset``."""
+        query = f"{keyword} in:name,description,topics"
+        if search_window:
+            query = f"{query} {search_window}"
+        search_results = self.github_client.search_repositories(query=query, sort="stars", order="desc")
+        return enumerate(search_results[offset:per_keyword_limit], start=offset + 1)
+
+    def _repository_from_source(self, repo: Any, star_growth_rate: float = 0.0) -> RepositoryData:
+        pushed_at = getattr(repo, 'pushed_at', None)
+        open_issues = getattr(repo, 'open_issues_count', None)
+        return RepositoryData(
+            name=repo.full_name,
+            rating=self._rate_repository(repo.stargazers_count, star_growth_rate),
+            url=repo.html_url,
+            description=repo.description or "",
+            topics=list(self._extract_topics_from_source(repo)),
+            language=repo.language or "",
+            stars=repo.stargazers_count,
+            forks=repo.forks_count,
+            pushed_at=pushed_at if isinstance(pushed_at, datetime) else None,
+            open_issues=open_issues if isinstance(open_issues, int) else 0,
+        )
+
+    def enrich_repositories(self, max_workers: int = ENRICHMENT_WORKERS) -> int:
+        """Attach README and activity signals to monitored repositories.
+
+        Signals are fetched concurrently and cached by repository and head commit
+        SHA, so unchanged repositories only cost one lookup. Returns the number of
+        repositories whose signals were (re)fetched.
+        """
+        source = self.enrichment_source
+        if source is None:
+            if not self.github_client:
+                raise RuntimeError("GitHub client is not initialized. Provide a token or an enrichment source.")
+            source = self.enrichment_source = GitHubEnrichmentSource(self.github_client)
+
+        cache = self._enrichment_cache
+
+        def enrich(repo: RepositoryData) -> Tuple[RepositoryData, Optional[EnrichmentData], bool]:
+            try:
+                head_sha = source.head_sha(repo.name)
+                cached = cache.get(repo.url)
+                if cached is not None and cached.head_sha == head_sha:
+                    return repo, cached, False
+                return repo, source.fetch(repo.name, head_sha), True
+            except Exception as exc:
+                print(f"Failed to enrich '{repo.name}': {exc}")
+                return repo, None, False
+
+        fetched: Dict[str, EnrichmentData] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for repo, data, refreshed in executor.map(enrich, list(self.repositories)):
+                if data is None:
+                    continue
+                repo.head_sha = data.head_sha
+                repo.readme = data.readme
+                if data.pushed_at is not None:
+                    repo.pushed_at = data.pushed_at
+                if data.open_issues is not None:
+                    repo.open_issues = data.open_issues
+                if refreshed:
+                    fetched[repo.url] = data
+
+        cache.update(fetched)
+        if self.storage and fetched:
+            self.storage.save_enrichment(fetched)
+        self._generation += 1
+        return len(fetched)
+
+    @staticmethod
+    def _rate_repository(stars: int, star_growth_rate: float = 0.0) -> int:
+        rating = int(stars / 500) + 1
+        if star_growth_rate >= STAR_GROWTH_BONUS_RATE:
+            rating += 1
+        return min(5, max(1, rating))
 
     @staticmethod
     def _extract_topics_from_source(source: Any) -> Set[str]:
@@ -155,153 +923,795 @@ class AP2Monitor:
         return topics
 
     def _generate_explanation(self, repo: RepositoryData) -> str:
-        explanations: List[str] = []
-        topics_lower = {topic.lower() for topic in repo.topics}
-
-        if topics_lower.intersection({topic.lower() for topic in AI_TOPICS}):
-            explanations.append("AI/ML capabilities for intelligent applications")
-        if topics_lower.intersection({topic.lower() for topic in CLOUD_TOPICS}):
-            explanations.append("cloud-native technologies suitable for modern infrastructure")
-        if topics_lower.intersection({topic.lower() for topic in WEB_TOPICS}):
-            explanations.append("web development focused with modern frameworks")
-
-        if repo.language and len(explanations) < 2 and repo.language in LANGUAGE_INSIGHTS:
-            explanations.append(f"{repo.language} - {LANGUAGE_INSIGHTS[repo.language]}")
-
-        if len(explanations) < 2:
-            if repo.stars > 1000:
-                explanations.append("highly popular with strong community adoption")
-            elif repo.stars > 100:
-                explanations.append("growing popularity with active community")
-
-        if len(explanations) < 2:
-            if repo.forks > 500:
-                explanations.append("actively forked indicating collaborative development")
-            elif repo.forks > 50:
-                explanations.append("moderate forking activity showing developer interest")
-
-        if not explanations:
-            explanations.append("general-purpose repository with standard development practices")
-
-        return ". ".join(explanations[:2])
+        return self.rules.explain(repo)
 
     def _assess_dws_iq_suitability(self, repo: RepositoryData) -> bool:
-        suitable_criteria: List[bool] = []
-
-        dws_languages = ['Python', 'Go', 'JavaScript', 'TypeScript', 'C#', 'Java']
-        if repo.language in dws_languages:
-            suitable_criteria.append(True)
+        return self.rules.is_suitable(repo)
 
-        topics_lower = {topic.lower() for topic in repo.topics}
-        if topics_lower.intersection({topic.lower() for topic in DWS_RELEVANT_TOPICS}):
-            suitable_criteria.append(True)
-
-        if repo.stars >= 10 and repo.rating >= 3:
-            suitable_criteria.append(True)
+    def generate_top_rated_report(self) -> List[Dict[str, Any]]:
+        sorted_repos = sorted(self.repositories, key=lambda x: x.rating, reverse=True)
 
-        if repo.description:
-            description_lower = repo.description.lower()
-            if any(keyword in description_lower for keyword in DWS_KEYWORDS):
-                suitable_criteria.append(True)
+        return [self._top_rated_entry(repo) for repo in sorted_repos]
 
-        return len(suitable_criteria) >= 2
+    def _top_rated_entry(self, repo: RepositoryData) -> Dict[str, Any]:
+        """Build one ``top_rated`` entry; shared by the reports and the query index."""
+        return {
+            "name": repo.name,
+            "rating": repo.rating,
+            "url": repo.url,
+            "explanation": self._generate_explanation(repo),
+            "dws_iq_suitable": self._assess_dws_iq_suitability(repo),
+        }
 
-    def generate_top_rated_report(self) -> List[Dict[str, Any]]:
+    def generate_detailed_report(self) -> List[Dict[str, Any]]:
+        """Top-rated report entries extended with the raw repository fields."""
         sorted_repos = sorted(self.repositories, key=lambda x: x.rating, reverse=True)
-
-        report: List[Dict[str, Any]] = []
-        for repo in sorted_repos:
-            report.append({
-                "name": repo.name,
-                "rating": repo.rating,
-                "url": repo.url,
-                "explanation": self._generate_explanation(repo),
-                "dws_iq_suitable": self._assess_dws_iq_suitability(repo),
+        report = self.generate_top_rated_report()
+        for entry, repo in zip(report, sorted_repos):
+            entry.update({
+                "description": repo.description,
+                "language": repo.language,
+                "topics": list(repo.topics),
+                "stars": repo.stars,
+                "forks": repo.forks,
+                "open_issues": repo.open_issues,
+                "pushed_at": repo.pushed_at,
             })
         return report
 
+    def build_query_index(self) -> "RepositoryIndex":
+        """Return the query index, rebuilding it only when repositories changed."""
+        index = self._query_index
+        if index is None or index.generation != self._generation:
+            index = RepositoryIndex(
+                self.repositories,
+                self._top_rated_entry,
+                generation=self._generation,
+            )
+            self._query_index = index
+        return index
+
     def generate_json_report(self, indent: int = 2) -> str:
         report = {
             "top_rated": self.generate_top_rated_report()
         }
         return json.dumps(report, indent=indent)
 
-    def save_reports(self, base_path: str = ".") -> None:
+    def save_reports(self, base_path: str = ".", formats: Optional[List[str]] = None,
+                     json_indent: Optional[int] = 2) -> None:
+        """Write reports to ``<base_path>/Results`` in each requested format.
+
+        ``formats`` defaults to ``REPORT_FORMATS``; see ``SUPPORTED_REPORT_FORMATS``.
+        ``json_indent=None`` writes compact JSON. Parquet and Feather reports require
+        pyarrow. Each file is serialized once and dated copies are file copies.
+        """
+        formats = list(formats or REPORT_FORMATS)
+        unknown = [fmt for fmt in formats if fmt not in SUPPORTED_REPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unsupported report format(s): {', '.join(unknown)}")
+        if pyarrow is None and {"parquet", "feather"}.intersection(formats):
+            raise RuntimeError("pyarrow is required for parquet and feather reports. Install pyarrow.")
+
         results_dir = os.path.join(base_path, "Results")
         os.makedirs(results_dir, exist_ok=True)
 
-        report_data = self.generate_top_rated_report()
+        detailed = self.generate_detailed_report()
+        report_data = [
+            {key: entry[key] for key in ("name", "rating", "url", "explanation", "dws_iq_suitable")}
+            for entry in detailed
+        ]
         date_str = datetime.now().strftime("%Y%m%d")
 
-        json_report = {"top_rated": report_data}
-        json_file_path = os.path.join(results_dir, "report.json")
-        with open(json_file_path, 'w', encoding='utf-8') as f:
-            json.dump(json_report, f, indent=2, ensure_ascii=False)
-        print(f"JSON report saved to: {json_file_path}")
+        def dated_paths(extension: str) -> List[str]:
+            return [
+                os.path.join(results_dir, f"report.{extension}"),
+                os.path.join(results_dir, f"report_{date_str}.{extension}"),
+            ]
+
+        if "json" in formats:
+            def write_json(path: str) -> None:
+                separators = (",", ":") if json_indent is None else None
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump({"top_rated": report_data}, f, indent=json_indent,
+                              separators=separators, ensure_ascii=False)
+            self._write_report("JSON", dated_paths("json"), write_json)
+
+        if "ndjson" in formats:
+            def write_ndjson(path: str) -> None:
+                with open(path, 'w', encoding='utf-8') as f:
+                    for entry in detailed:
+                        f.write(json.dumps(entry, default=_json_default, ensure_ascii=False,
+                                           separators=(",", ":")))
+                        f.write("\n")
+            self._write_report("NDJSON", dated_paths("ndjson"), write_ndjson)
+
+        if "excel" in formats:
+            if report_data:
+                df = pd.DataFrame(report_data)
+                paths = dated_paths("xlsx") + [os.path.join(results_dir, f"results{date_str}.xlsx")]
+                self._write_report(
+                    "Excel", paths, lambda path: df.to_excel(path, index=False, engine='openpyxl'))
+            else:
+                print("No data to save to Excel file")
+
+        if "parquet" in formats or "feather" in formats:
+            table = self._report_table(detailed)
+            if "parquet" in formats:
+                self._write_report("Parquet", dated_paths("parquet"), lambda path: pyarrow.parquet.write_table(
+                    table, path, compression=COLUMNAR_COMPRESSION))
+            if "feather" in formats:
+                self._write_report("Feather", dated_paths("feather"), lambda path: pyarrow.feather.write_feather(
+                    table, path, compression=COLUMNAR_COMPRESSION))
+
+    @staticmethod
+    def _write_report(label: str, paths: List[str], write: Callable[[str], None]) -> None:
+        write(paths[0])
+        print(f"{label} report saved to: {paths[0]}")
+        for path in paths[1:]:
+            shutil.copyfile(paths[0], path)
+            print(f"{label} report saved to: {path}")
+
+    @staticmethod
+    def _report_table(detailed: List[Dict[str, Any]]) -> "pa.Table":
+        """Build the columnar report with a fixed schema, independent of the data."""
+        return pa.Table.from_pylist(detailed, schema=_report_schema())
+
+
+def _report_schema() -> "pa.Schema":
+    return pa.schema([
+        ("name", pa.string()),
+        ("rating", pa.int8()),
+        ("url", pa.string()),
+        ("explanation", pa.string()),
+        ("dws_iq_suitable", pa.bool_()),
+        ("description", pa.string()),
+        ("language", pa.dictionary(pa.int32(), pa.string())),
+        ("topics", pa.list_(pa.string())),
+        ("stars", pa.int64()),
+        ("forks", pa.int64()),
+        ("open_issues", pa.int64()),
+        ("pushed_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RepositoryIndex:
+    """Precomputed lookup tables over a snapshot of monitored repositories.
+
+    Entries are stored in report order (rating descending) and every index
+    holds ascending positions into that list, so filtered results keep the
+    report ordering without re-sorting.
+    """
 
-        dated_json_path = os.path.join(results_dir, f"report_{date_str}.json")
-        with open(dated_json_path, 'w', encoding='utf-8') as f:
-            json.dump(json_report, f, indent=2, ensure_ascii=False)
-        print(f"JSON report saved to: {dated_json_path}")
+    def __init__(
+        self,
+        repositories: List[RepositoryData],
+        build_entry: Callable[[RepositoryData], Dict[str, Any]],
+        generation: int = 0,
+    ):
+        self.generation = generation
+        sorted_repos = sorted(repositories, key=lambda x: x.rating, reverse=True)
 
-        if report_data:
-            df = pd.DataFrame(report_data)
+        self.entries: List[Dict[str, Any]] = []
+        self.by_language: Dict[str, List[int]] = {}
+        self.by_topic: Dict[str, List[int]] = {}
+        self.dws_suitable: List[int] = []
+        self.dws_unsuitable: List[int] = []
+        self._negated_ratings: List[int] = []
 
-            excel_file_path = os.path.join(results_dir, "report.xlsx")
-            df.to_excel(excel_file_path, index=False, engine='openpyxl')
-            print(f"Excel report saved to: {excel_file_path}")
+        for position, repo in enumerate(sorted_repos):
+            entry = build_entry(repo)
+            suitable = entry["dws_iq_suitable"]
+            self.entries.append(entry)
+            self._negated_ratings.append(-repo.rating)
+            if repo.language:
+                self.by_language.setdefault(repo.language.lower(), []).append(position)
+            for topic in {topic.lower() for topic in repo.topics}:
+                self.by_topic.setdefault(topic, []).append(position)
+            (self.dws_suitable if suitable else self.dws_unsuitable).append(position)
 
-            dated_excel_path = os.path.join(results_dir, f"report_{date_str}.xlsx")
-            df.to_excel(dated_excel_path, index=False, engine='openpyxl')
-            print(f"Excel report saved to: {dated_excel_path}")
+    def _rating_cutoff(self, min_rating: int) -> int:
+        """Number of leading entries whose rating is at least ``min_rating``."""
+        return bisect.bisect_right(self._negated_ratings, -min_rating)
 
-            results_excel_path = os.path.join(results_dir, f"results{date_str}.xlsx")
-            df.to_excel(results_excel_path, index=False, engine='openpyxl')
-            print(f"Excel report saved to: {results_excel_path}")
+    def query(
+        self,
+        language: Optional[str] = None,
+        topic: Optional[str] = None,
+        min_rating: Optional[int] = None,
+        dws_iq_suitable: Optional[bool] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        candidates: List[List[int]] = []
+        if language is not None:
+            candidates.append(self.by_language.get(language.lower(), []))
+        if topic is not None:
+            candidates.append(self.by_topic.get(topic.lower(), []))
+        if dws_iq_suitable is not None:
+            candidates.append(self.dws_suitable if dws_iq_suitable else self.dws_unsuitable)
+
+        cutoff = len(self.entries) if min_rating is None else self._rating_cutoff(min_rating)
+
+        if candidates:
+            candidates.sort(key=len)
+            smallest, rest = candidates[0], [set(c) for c in candidates[1:]]
+            positions = [
+                position for position in smallest
+                if position < cutoff and all(position in other for other in rest)
+            ]
         else:
-            print("No data to save to Excel file")
-
-
-def main() -> None:
-    monitor = AP2Monitor()
-
-    example_repos = [
-        RepositoryData(
-            name="awesome-python",
-            rating=5,
-            url="https://github.com/vinta/awesome-python",
-            description="A curated list of awesome Python frameworks, libraries, software and resources",
-            topics=['python', 'awesome-list', 'resources'],
-            language="Python",
-            stars=2500,
-            forks=400,
-        ),
-        RepositoryData(
-            name="kubernetes",
-            rating=5,
-            url="https://github.com/kubernetes/kubernetes",
-            description="Production-Grade Container Scheduling and Management",
-            topics=['kubernetes', 'containers', 'orchestration', 'cloud'],
-            language="Go",
-            stars=15000,
-            forks=8000,
-        ),
-        RepositoryData(
-            name="small-project",
-            rating=3,
-            url="https://github.com/example/small-project",
-            description="A small utility project",
-            topics=['utility'],
-            language="JavaScript",
-            stars=5,
-            forks=1,
-        ),
-    ]
-
-    for repo in example_repos:
-        monitor.add_repository(repo)
-
-    monitor.save_reports()
+            positions = range(cutoff)
+
+        total = len(positions)
+        end = total if limit is None else offset + limit
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "top_rated": [self.entries[position] for position in positions[offset:end]],
+        }
+
+
+class QueryAPIError(ValueError):
+    """Raised for malformed query API requests."""
+
+
+def _parse_query_params(query_string: str) -> Dict[str, Any]:
+    raw = {key: values[-1] for key, values in parse_qs(query_string).items()}
+    params: Dict[str, Any] = {}
+
+    for key in ("language", "topic"):
+        if key in raw:
+            params[key] = raw[key]
+
+    for key in ("min_rating", "offset", "limit", "n"):
+        if key in raw:
+            try:
+                value = int(raw[key])
+            except ValueError:
+                raise QueryAPIError(f"'{key}' must be an integer")
+            if value < 0 and key != "min_rating":
+                raise QueryAPIError(f"'{key}' must not be negative")
+            params[key] = value
+
+    if "dws_iq_suitable" in raw:
+        value = raw["dws_iq_suitable"].lower()
+        if value not in ("true", "false", "1", "0"):
+            raise QueryAPIError("'dws_iq_suitable' must be true or false")
+        params["dws_iq_suitable"] = value in ("true", "1")
+
+    return params
+
+
+class QueryAPIHandler(BaseHTTPRequestHandler):
+    """Read-only JSON API over an ``AP2Monitor``.
+
+    Routes:
+        GET /repositories?language=&topic=&min_rating=&dws_iq_suitable=&offset=&limit=
+        GET /top?n=10  (``limit`` is an alias for ``n``; accepts the same filters but not ``offset``)
+    """
+
+    server: "QueryAPIServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        parts = urlsplit(self.path)
+        if parts.path not in ("/repositories", "/top"):
+            self._send_json(404, {"error": f"unknown path '{parts.path}'"})
+            return
+
+        try:
+            params = _parse_query_params(parts.query)
+        except QueryAPIError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+
+        if parts.path == "/top":
+            if "offset" in params:
+                self._send_json(400, {"error": "'offset' is not supported on /top"})
+                return
+            if "n" in params and "limit" in params:
+                self._send_json(400, {"error": "use either 'n' or 'limit' on /top"})
+                return
+            params["offset"] = 0
+            params["limit"] = params.pop("n", params.get("limit", 10))
+        elif "n" in params:
+            self._send_json(400, {"error": "'n' is only supported on /top; use 'limit'"})
+            return
+
+        etag, body = self.server.cached_response(params)
+        if etag in self._if_none_match():
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _if_none_match(self) -> Set[str]:
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class QueryAPIServer(ThreadingHTTPServer):
+    """HTTP server serving ``AP2Monitor`` data from its query index.
+
+    Serialized responses are cached per index generation together with their
+    ETag, so repeated polls are answered without touching the index again.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, monitor: "AP2Monitor", host: str = "127.0.0.1", port: int = 8000,
+                 cache_size: int = QUERY_CACHE_SIZE, quiet: bool = False):
+        super().__init__((host, port), QueryAPIHandler)
+        self.monitor = monitor
+        self.cache_size = cache_size
+        self.quiet = quiet
+        self._cache: "OrderedDict[Tuple[Any, ...], Tuple[str, bytes]]" = OrderedDict()
+        self._cache_generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def cached_response(self, params: Dict[str, Any]) -> Tuple[str, bytes]:
+        with self._lock:
+            index = self.monitor.build_query_index()
+            if self._cache_generation != index.generation:
+                self._cache.clear()
+                self._cache_generation = index.generation
+
+            key = tuple(sorted(params.items()))
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+            body = json.dumps(index.query(**params), ensure_ascii=False).encode("utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            self._cache[key] = (etag, body)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return etag, body
+
+
+def serve(monitor: AP2Monitor, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Serve the monitor's repositories over HTTP until interrupted."""
+    server = QueryAPIServer(monitor, host, port)
+    print(f"Serving query API on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@dataclass
+class SweepTask:
+    id: int
+    keyword: str
+    search_window: Optional[str]
+    per_keyword_limit: int
+    attempts: int
+
+
+class WorkQueue:
+    """SQLite-backed queue that shards a keyword sweep across worker processes.
+
+    Each task is one keyword and optional search window (a GitHub qualifier such as
+    ``stars:>=1000``). Workers lease tasks; a lease that is not completed within
+    ``lease_seconds`` (e.g. the worker died) is handed to the next worker, and a
+    task failing ``max_attempts`` times is marked failed. Rate-limited tasks are
+    released without using up an attempt.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT NOT NULL,
+            search_window TEXT,
+            per_keyword_limit INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker TEXT,
+            leased_until REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, leased_until);
+
+        CREATE TABLE IF NOT EXISTS results (
+            task_id INTEGER NOT NULL REFERENCES tasks (id),
+            url TEXT NOT NULL,
+            repository TEXT NOT NULL,
+            PRIMARY KEY (task_id, url)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None):
+        self.path = path
+        self.lease_seconds = WORK_QUEUE_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = WORK_QUEUE_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def enqueue(self, keywords: List[str], per_keyword_limit: int = 10,
+                search_windows: Optional[List[Optional[str]]] = None) -> int:
+        """Add one task per keyword and search window. Returns the number of tasks added."""
+        windows = search_windows or [None]
+        tasks = [(keyword, window, per_keyword_limit) for keyword in keywords for window in windows]
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT INTO tasks (keyword, search_window, per_keyword_limit) VALUES (?, ?, ?)", tasks
+            )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return len(tasks)
+
+    def claim(self, worker: str) -> Optional[SweepTask]:
+        """Lease the next pending (or expired) task to ``worker``."""
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute(
+                """
+                UPDATE tasks SET status = 'failed', leased_until = NULL,
+                    error = COALESCE(error, 'lease expired after final attempt')
+                WHERE status = 'leased' AND leased_until < ? AND attempts >= ?
+                """,
+                (now, self.max_attempts),
+            )
+            row = self.connection.execute(
+                """
+                SELECT id, keyword, search_window, per_keyword_limit, attempts FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND leased_until < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    """
+                    UPDATE tasks SET status = 'leased', worker = ?, leased_until = ?, attempts = attempts + 1
+                    WHERE id = ?
+                    """,
+                    (worker, now + self.lease_seconds, row[0]),
+                )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        task_id, keyword, search_window, per_keyword_limit, attempts = row
+        return SweepTask(task_id, keyword, search_window, per_keyword_limit, attempts + 1)
+
+    def complete(self, task: SweepTask, repositories: List[RepositoryData]) -> None:
+        """Store a task's repositories and mark it done in one transaction."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("DELETE FROM results WHERE task_id = ?", (task.id,))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results (task_id, url, repository) VALUES (?, ?, ?)",
+                [(task.id, repo.url, json.dumps(asdict(repo), default=_json_default)) for repo in repositories],
+            )
+            self.connection.execute(
+                "UPDATE tasks SET status = 'done', leased_until = NULL, error = NULL WHERE id = ?", (task.id,)
+            )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def fail(self, task: SweepTask, error: str) -> None:
+        """Release a task for retry, or mark it failed after ``max_attempts``."""
+        status = "failed" if task.attempts >= self.max_attempts else "pending"
+        self.connection.execute(
+            "UPDATE tasks SET status = ?, leased_until = NULL, error = ? WHERE id = ?",
+            (status, error, task.id),
+        )
+
+    def release(self, task: SweepTask, error: str) -> None:
+        """Return a leased task to the queue without counting the attempt."""
+        self.connection.execute(
+            """
+            UPDATE tasks SET status = 'pending', leased_until = NULL, error = ?,
+                attempts = MAX(attempts - 1, 0)
+            WHERE id = ? AND status = 'leased'
+            """,
+            (error, task.id),
+        )
+
+    def is_empty(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None
+
+    def progress(self) -> Dict[str, int]:
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for status, count in self.connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def is_finished(self) -> bool:
+        counts = self.progress()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def merged_repositories(self) -> List[RepositoryData]:
+        """Repositories from all completed tasks, deduplicated by URL (earliest task wins)."""
+        merged: Dict[str, RepositoryData] = {}
+        for url, repository in self.connection.execute(
+            "SELECT url, repository FROM results ORDER BY task_id"
+        ):
+            if url not in merged:
+                merged[url] = _repository_from_dict(json.loads(repository))
+        return list(merged.values())
+
+
+def _rate_limit_wait(exc: Exception) -> float:
+    """Seconds until a rate limit resets, from the ``Retry-After`` or ``X-RateLimit-Reset`` header."""
+    headers = {str(key).lower(): value for key, value in (getattr(exc, "headers", None) or {}).items()}
+    try:
+        if "retry-after" in headers:
+            return max(float(headers["retry-after"]), 0.0)
+        if "x-ratelimit-reset" in headers:
+            return max(float(headers["x-ratelimit-reset"]) - time.time(), 0.0)
+    except (TypeError, ValueError):
+        pass
+    return float(WORK_QUEUE_RATE_LIMIT_WAIT)
+
+
+def run_worker(queue_path: str, github_token: Optional[str] = None, worker_id: Optional[str] = None,
+               github_client: Optional[Any] = None, rate_limit_max_wait: Optional[float] = None) -> int:
+    """Process sweep tasks from the queue until it is finished. Returns the number completed.
+
+    The worker keeps polling while the queue is empty (the coordinator has not
+    enqueued yet) or other workers still hold leases, so it can take over tasks
+    whose lease expires. On a rate limit the task is released without using up an
+    attempt and the worker sleeps until the limit resets, or stops if that is more
+    than ``rate_limit_max_wait`` seconds away.
+    """
+    worker_id = worker_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    monitor = AP2Monitor(github_token=github_token)
+    if github_client is not None:
+        monitor.github_client = github_client
+    if not monitor.github_client:
+        raise RuntimeError("GitHub client is not initialized. Provide a token or ensure PyGithub is installed.")
+
+    if rate_limit_max_wait is None:
+        rate_limit_max_wait = WORK_QUEUE_RATE_LIMIT_MAX_WAIT
+    queue = WorkQueue(queue_path)
+    completed = 0
+    try:
+        while True:
+            task = queue.claim(worker_id)
+            if task is None:
+                if not queue.is_empty() and queue.is_finished():
+                    return completed
+                time.sleep(WORK_QUEUE_POLL_SECONDS)
+                continue
+            try:
+                repositories = [
+                    monitor._repository_from_source(repo)
+                    for _, repo in monitor._search_keyword(
+                        task.keyword, task.per_keyword_limit, search_window=task.search_window)
+                ]
+            except RateLimitExceededException as exc:
+                queue.release(task, str(exc))
+                wait = _rate_limit_wait(exc)
+                if wait > rate_limit_max_wait:
+                    print(f"Worker {worker_id}: rate limited for {wait:.0f}s at keyword '{task.keyword}', stopping")
+                    return completed
+                print(f"Worker {worker_id}: rate limited at keyword '{task.keyword}', waiting {wait:.0f}s")
+                time.sleep(wait)
+                continue
+            except Exception as exc:
+                print(f"Worker {worker_id}: failed keyword '{task.keyword}': {exc}")
+                queue.fail(task, str(exc))
+                continue
+            queue.complete(task, repositories)
+            completed += 1
+    finally:
+        queue.close()
+
+
+def distributed_sweep(queue_path: str, keywords: Optional[List[str]] = None, per_keyword_limit: int = 10,
+                      search_windows: Optional[List[Optional[str]]] = None,
+                      tokens: Optional[List[str]] = None, processes: int = 0,
+                      monitor: Optional[AP2Monitor] = None) -> AP2Monitor:
+    """Coordinate a sharded sweep and merge the results into ``monitor``.
+
+    Enqueues the keywords (times ``search_windows``), starts ``processes`` local
+    workers, each using its own entry of ``tokens`` round-robin, then waits until
+    every task is done or failed. A local worker that exits early (crash or long
+    rate limit) is restarted up to ``WORK_QUEUE_MAX_ATTEMPTS`` times so leased
+    tasks are recovered once their lease expires. With ``processes=0`` only external workers
+    (``python monitor.py --worker --queue <path>``) drain the queue. The queue must
+    be empty so one sweep's tasks and results never mix with another's. Merged
+    repositories are re-rated with the monitor's storage growth rates, matching
+    ``fetch_repositories``.
+    """
+    monitor = monitor or AP2Monitor()
+    queue = WorkQueue(queue_path)
+    try:
+        if not queue.is_empty():
+            raise ValueError(f"Work queue '{queue_path}' already holds a sweep; use a new queue file")
+        queue.enqueue(keywords or DEFAULT_KEYWORDS, per_keyword_limit, search_windows)
+
+        tokens = tokens or [monitor.github_token]
+
+        def start_worker(i: int) -> multiprocessing.Process:
+            worker = multiprocessing.Process(
+                target=run_worker, args=(queue_path, tokens[i % len(tokens)], f"local-{i}"), daemon=True
+            )
+            worker.start()
+            return worker
+
+        workers = [start_worker(i) for i in range(processes)]
+        restarts = [0] * processes
+        while not queue.is_finished():
+            for i, worker in enumerate(workers):
+                if not worker.is_alive() and restarts[i] < WORK_QUEUE_MAX_ATTEMPTS:
+                    restarts[i] += 1
+                    workers[i] = start_worker(i)
+            if workers and not any(worker.is_alive() for worker in workers):
+                break
+            time.sleep(WORK_QUEUE_POLL_SECONDS)
+        for worker in workers:
+            worker.join()
+
+        counts = queue.progress()
+        if counts["failed"] or counts["pending"] or counts["leased"]:
+            print(f"Distributed sweep incomplete: {counts}")
+
+        growth_rates = monitor.storage.star_growth_rates() if monitor.storage else {}
+        seen_urls = {repo.url for repo in monitor.repositories}
+        for repo_data in queue.merged_repositories():
+            if repo_data.url not in seen_urls:
+                repo_data.rating = monitor._rate_repository(repo_data.stars, growth_rates.get(repo_data.url, 0.0))
+                monitor.add_repository(repo_data)
+                seen_urls.add(repo_data.url)
+    finally:
+        queue.close()
+
+    if monitor.storage:
+        monitor.storage.record_sweep(monitor.repositories)
+    return monitor
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="AP2 Repository Monitoring Agent")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve the query API instead of exiting after saving reports")
+    parser.add_argument("--host", default="127.0.0.1", help="query API bind address")
+    parser.add_argument("--port", type=int, default=8000, help="query API port")
+    parser.add_argument("--formats", nargs="+", choices=SUPPORTED_REPORT_FORMATS,
+                        default=list(REPORT_FORMATS), help="report formats to write")
+    parser.add_argument("--compact-json", action="store_true", help="write JSON without indentation")
+    parser.add_argument("--fetch", action="store_true",
+                        help="search GitHub for DEFAULT_KEYWORDS instead of using the example repositories")
+    parser.add_argument("--checkpoint", help="checkpoint file for a resumable --fetch sweep")
+    parser.add_argument("--resume", action="store_true", help="continue the sweep saved in --checkpoint")
+    parser.add_argument("--queue", help="work queue database for a distributed sweep")
+    parser.add_argument("--worker", action="store_true", help="process tasks from --queue, then exit")
+    parser.add_argument("--coordinate", action="store_true",
+                        help="enqueue DEFAULT_KEYWORDS into --queue, wait for workers and merge their results")
+    parser.add_argument("--processes", type=int, default=0, help="local worker processes started by --coordinate")
+    parser.add_argument("--no-enrich", action="store_true",
+                        help="skip README and activity enrichment after --fetch or --coordinate")
+    parser.add_argument("--search-windows", nargs="+",
+                        help="GitHub qualifiers each keyword is split into, e.g. 'stars:>=1000' 'stars:<1000'")
+    parser.add_argument("--db", default=os.getenv("AP2_DB"),
+                        help="SQLite history database (default: $AP2_DB); enables storage when set")
+    args = parser.parse_args(argv)
+
+    if (args.worker or args.coordinate) and not args.queue:
+        parser.error("--worker and --coordinate require --queue")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+    if args.checkpoint and not args.fetch:
+        parser.error("--checkpoint requires --fetch")
+
+    if args.worker:
+        completed = run_worker(args.queue)
+        print(f"Worker completed {completed} task(s)")
+        return
+
+    storage = SQLiteStorage(args.db) if args.db else None
+    try:
+        unfinished = _run_monitor(AP2Monitor(storage=storage), args)
+    finally:
+        if storage:
+            storage.close()
+
+    if unfinished:
+        hint = f"; rerun with --checkpoint {args.checkpoint} --resume" if args.checkpoint else ""
+        print(f"Sweep incomplete: {len(unfinished)} keyword(s) unfinished{hint}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _run_monitor(monitor: AP2Monitor, args: argparse.Namespace) -> List[str]:
+    """Build, report and optionally serve the monitor. Returns the unfinished sweep keywords."""
+    unfinished: List[str] = []
+    if args.coordinate:
+        tokens = [token for token in os.getenv("AP2_GITHUB_TOKENS", "").split(",") if token] or None
+        distributed_sweep(args.queue, search_windows=args.search_windows, tokens=tokens,
+                          processes=args.processes, monitor=monitor)
+    elif args.fetch:
+        unfinished = monitor.fetch_repositories(checkpoint_path=args.checkpoint, resume=args.resume)
+    else:
+        example_repos = [
+            RepositoryData(
+                name="awesome-python",
+                rating=5,
+                url="https://github.com/vinta/awesome-python",
+                description="A curated list of awesome Python frameworks, libraries, software and resources",
+                topics=['python', 'awesome-list', 'resources'],
+                language="Python",
+                stars=2500,
+                forks=400,
+            ),
+            RepositoryData(
+                name="kubernetes",
+                rating=5,
+                url="https://github.com/kubernetes/kubernetes",
+                description="Production-Grade Container Scheduling and Management",
+                topics=['kubernetes', 'containers', 'orchestration', 'cloud'],
+                language="Go",
+                stars=15000,
+                forks=8000,
+            ),
+            RepositoryData(
+                name="small-project",
+                rating=3,
+                url="https://github.com/example/small-project",
+                description="A small utility project",
+                topics=['utility'],
+                language="JavaScript",
+                stars=5,
+                forks=1,
+            ),
+        ]
+
+        for repo in example_repos:
+            monitor.add_repository(repo)
+
+    if (args.coordinate or args.fetch) and not args.no_enrich:
+        monitor.enrich_repositories()
+
+    monitor.save_reports(formats=args.formats, json_indent=None if args.compact_json else 2)
+
+    if args.serve:
+        serve(monitor, args.host, args.port)
+    return unfinished
 
 
 if __name__ == "__main__":
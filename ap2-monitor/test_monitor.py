@@ -8,16 +8,28 @@ including tests for the new explanation and dws_iq_suitable fields.
 
 import unittest
 import json
+import multiprocessing
 from unittest.mock import Mock, patch
 import sys
 import os
-from datetime import datetime
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
 import pandas as pd
+from github.GithubException import RateLimitExceededException
 
 # Add the ap2-monitor directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from monitor import AP2Monitor, RepositoryData
+import monitor
+from monitor import (
+    KEYWORD_MAX_ATTEMPTS, AP2Monitor, EnrichmentData, GitHubEnrichmentSource, RepositoryData, QueryAPIServer, RuleConfigError, RuleEngine,
+    SQLiteStorage, SweepCheckpoint, WorkQueue, distributed_sweep, run_worker,
+)
 
 
 class TestRepositoryData(unittest.TestCase):
@@ -483,6 +495,955 @@ class TestFileSaving(unittest.TestCase):
         results_excel = os.path.join(self.test_dir, "Results", "results0815012025.xlsx")
         self.assertTrue(os.path.exists(results_excel))
 
+    @patch('monitor.datetime')
+    def test_save_reports_compact_json(self, mock_datetime):
+        """Test json_indent=None writes compact JSON"""
+        mock_datetime.now.return_value.strftime.return_value = '0815012025'
+        self.monitor.save_reports(self.test_dir, formats=["json"], json_indent=None)
+
+        with open(os.path.join(self.test_dir, "Results", "report.json"), encoding='utf-8') as f:
+            content = f.read()
+        self.assertNotIn("\n", content)
+        self.assertIn('{"top_rated":[{"name":"test-repo","rating":4,', content)
+        self.assertEqual(json.loads(content)["top_rated"][0]["name"], "test-repo")
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "Results", "report.xlsx")))
+
+    @patch('monitor.datetime')
+    def test_save_reports_ndjson(self, mock_datetime):
+        """Test NDJSON output has one record per repository with raw fields"""
+        mock_datetime.now.return_value.strftime.return_value = '0815012025'
+        self.monitor.add_repository(RepositoryData(name="second", rating=1, url="https://github.com/test/second"))
+        self.monitor.save_reports(self.test_dir, formats=["ndjson"])
+
+        with open(os.path.join(self.test_dir, "Results", "report.ndjson"), encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["name"] for r in records], ["test-repo", "second"])
+        self.assertEqual(records[0]["stars"], 100)
+        self.assertEqual(records[0]["topics"], ['test', 'python'])
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "Results", "report_0815012025.ndjson")))
+
+    @patch('monitor.datetime')
+    def test_save_reports_columnar(self, mock_datetime):
+        """Test Parquet and Feather outputs keep typed raw columns"""
+        if monitor.pyarrow is None:
+            self.skipTest("pyarrow is not installed")
+        mock_datetime.now.return_value.strftime.return_value = '0815012025'
+        self.monitor.save_reports(self.test_dir, formats=["parquet", "feather"])
+
+        results_dir = os.path.join(self.test_dir, "Results")
+        for df in (pd.read_parquet(os.path.join(results_dir, "report.parquet")),
+                   pd.read_feather(os.path.join(results_dir, "report_0815012025.feather"))):
+            self.assertEqual(df.iloc[0]['name'], "test-repo")
+            self.assertEqual(df.iloc[0]['stars'], 100)
+            self.assertEqual(list(df.iloc[0]['topics']), ['test', 'python'])
+            self.assertEqual(str(df['rating'].dtype), "int8")
+
+    @patch('monitor.datetime')
+    def test_columnar_schema_is_fixed(self, mock_datetime):
+        """Test Parquet/Feather schemas do not depend on the data"""
+        if monitor.pyarrow is None:
+            self.skipTest("pyarrow is not installed")
+        import pyarrow.feather
+        import pyarrow.parquet
+        mock_datetime.now.return_value.strftime.return_value = '0815012025'
+        results_dir = os.path.join(self.test_dir, "Results")
+
+        schemas = []
+        for repositories in ([self.test_repo], [RepositoryData(name="bare", rating=1, url="https://x/bare")], []):
+            self.monitor.repositories = repositories
+            self.monitor.save_reports(self.test_dir, formats=["parquet", "feather"])
+            schemas.append(pyarrow.parquet.read_schema(os.path.join(results_dir, "report.parquet")))
+            schemas.append(pyarrow.feather.read_table(os.path.join(results_dir, "report.feather")).schema)
+
+        self.assertTrue(all(schema.equals(schemas[0]) for schema in schemas))
+        topics = schemas[0].field("topics").type
+        language = schemas[0].field("language").type
+        self.assertTrue(pyarrow.types.is_list(topics) and pyarrow.types.is_string(topics.value_type))
+        self.assertEqual((str(language.index_type), str(language.value_type)), ("int32", "string"))
+
+    def test_save_reports_rejects_unknown_format(self):
+        """Test unsupported formats raise before anything is written"""
+        with self.assertRaises(ValueError):
+            self.monitor.save_reports(self.test_dir, formats=["csv"])
+        self.assertFalse(os.path.exists(self.test_dir))
+
+
+class TestQueryAPI(unittest.TestCase):
+    """Test cases for the HTTP query API and its index"""
+
+    def setUp(self):
+        """Start a query server on an ephemeral port"""
+        self.monitor = AP2Monitor()
+        for repo in [
+            RepositoryData(name="py-ai", rating=5, url="https://github.com/a/py-ai",
+                           description="Intelligent agent platform", topics=['ai', 'Python'],
+                           language="Python", stars=3000, forks=600),
+            RepositoryData(name="go-cloud", rating=4, url="https://github.com/a/go-cloud",
+                           description="Cloud tooling", topics=['cloud', 'docker'],
+                           language="Go", stars=800, forks=90),
+            RepositoryData(name="py-util", rating=2, url="https://github.com/a/py-util",
+                           description="Small helpers", topics=['utility'],
+                           language="Python", stars=3, forks=0),
+        ]:
+            self.monitor.add_repository(repo)
+
+        self.server = QueryAPIServer(self.monitor, port=0, quiet=True)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        """Stop the query server"""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get(self, path, headers=None):
+        request = urllib.request.Request(self.base_url + path, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, dict(exc.headers), exc.read()
+
+    def test_index_filters_keep_rating_order(self):
+        """Test index queries combine filters and keep report ordering"""
+        index = self.monitor.build_query_index()
+
+        result = index.query(language="python")
+        self.assertEqual([r["name"] for r in result["top_rated"]], ["py-ai", "py-util"])
+
+        result = index.query(language="Python", min_rating=3)
+        self.assertEqual([r["name"] for r in result["top_rated"]], ["py-ai"])
+
+        result = index.query(topic="PYTHON", dws_iq_suitable=True)
+        self.assertEqual(result["total"], 1)
+
+        result = index.query(offset=1, limit=1)
+        self.assertEqual(result["total"], 3)
+        self.assertEqual([r["name"] for r in result["top_rated"]], ["go-cloud"])
+
+    def test_index_rebuilt_only_after_changes(self):
+        """Test the index is reused until a repository is added"""
+        index = self.monitor.build_query_index()
+        self.assertIs(self.monitor.build_query_index(), index)
+
+        self.monitor.add_repository(RepositoryData(name="new", rating=1, url="https://github.com/a/new"))
+        self.assertIsNot(self.monitor.build_query_index(), index)
+
+    def test_repositories_endpoint(self):
+        """Test filtered repository queries over HTTP"""
+        status, _, body = self._get("/repositories?language=go&dws_iq_suitable=true")
+        self.assertEqual(status, 200)
+        data = json.loads(body)
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["top_rated"][0]["name"], "go-cloud")
+
+    def test_top_endpoint(self):
+        """Test top-N endpoint returns the highest rated repositories"""
+        status, _, body = self._get("/top?n=2")
+        self.assertEqual(status, 200)
+        data = json.loads(body)
+        self.assertEqual([r["rating"] for r in data["top_rated"]], [5, 4])
+
+    def test_top_limit_alias_and_rejected_offset(self):
+        """Test /top accepts limit as an alias for n and rejects offset"""
+        status, _, body = self._get("/top?limit=1")
+        self.assertEqual(status, 200)
+        self.assertEqual([r["name"] for r in json.loads(body)["top_rated"]], ["py-ai"])
+
+        for path in ("/top?offset=1", "/top?n=1&limit=2", "/repositories?n=1"):
+            status, _, _ = self._get(path)
+            self.assertEqual(status, 400, path)
+
+    def test_index_entries_match_report(self):
+        """Test API entries are built the same way as the top_rated report"""
+        index = self.monitor.build_query_index()
+        self.assertEqual(index.entries, self.monitor.generate_top_rated_report())
+
+    def test_etag_not_modified(self):
+        """Test conditional requests return 304 until data changes"""
+        _, headers, _ = self._get("/repositories")
+        etag = headers["ETag"]
+
+        status, _, body = self._get("/repositories", {"If-None-Match": etag})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+        self.monitor.add_repository(RepositoryData(name="new", rating=1, url="https://github.com/a/new"))
+        status, headers, _ = self._get("/repositories", {"If-None-Match": etag})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], etag)
+
+    def test_invalid_parameters(self):
+        """Test malformed queries and unknown paths are rejected"""
+        status, _, body = self._get("/repositories?min_rating=high")
+        self.assertEqual(status, 400)
+        self.assertIn("min_rating", json.loads(body)["error"])
+
+        status, _, _ = self._get("/unknown")
+        self.assertEqual(status, 404)
+
+
+class TestRuleEngine(unittest.TestCase):
+    """Test cases for configurable explanation and suitability rules"""
+
+    def setUp(self):
+        """Set up a client-specific rule configuration"""
+        self.config = {
+            "explanation": {
+                "max_items": 1,
+                "fallback": "nothing notable",
+                "rules": [
+                    {"name": "payments", "when": {"topics_any": ["Payments", "ap2"]},
+                     "text": "agent payments support"},
+                    {"name": "language", "insights": {"Rust": "memory safe"},
+                     "text": "{language}: {insight}"},
+                ],
+            },
+            "suitability": {
+                "min_criteria": 1,
+                "rules": [
+                    {"name": "rust", "when": {"language_in": ["Rust"]}},
+                    {"name": "keywords", "when": {"description_any": ["agent"]}},
+                ],
+            },
+        }
+        self.repo = RepositoryData(
+            name="ap2-rs", rating=2, url="https://github.com/example/ap2-rs",
+            description="Agent payments in Rust", topics=['AP2'], language="Rust", stars=3,
+        )
+
+    def test_custom_rules_from_file(self):
+        """Test rules loaded from a JSON file replace the defaults"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f)
+            with patch.dict(os.environ, {"AP2_RULES_FILE": path}):
+                monitor = AP2Monitor()
+
+        self.assertEqual(monitor._generate_explanation(self.repo), "agent payments support")
+        self.assertTrue(monitor._assess_dws_iq_suitability(self.repo))
+
+        plain = RepositoryData(name="plain", rating=1, url="https://github.com/example/plain")
+        self.assertEqual(monitor._generate_explanation(plain), "nothing notable")
+        self.assertFalse(monitor._assess_dws_iq_suitability(plain))
+
+    def test_insight_template(self):
+        """Test language insight rules format the matching text"""
+        engine = RuleEngine(self.config)
+        self.repo.topics = []
+        self.assertEqual(engine.explain(self.repo), "Rust: memory safe")
+
+    def test_statistics_and_short_circuit(self):
+        """Test hit statistics and that decided assessments skip remaining rules"""
+        engine = RuleEngine(self.config)
+        engine.is_suitable(self.repo)
+
+        stats = engine.statistics()["suitability"]
+        self.assertEqual(stats["rust"], {"evaluated": 1, "hits": 1})
+        self.assertEqual(stats["keywords"], {"evaluated": 0, "hits": 0})
+
+        engine.reset_statistics()
+        self.assertEqual(engine.statistics()["suitability"]["rust"]["evaluated"], 0)
+
+    def test_invalid_rules_rejected(self):
+        """Test unknown conditions and missing texts raise RuleConfigError"""
+        with self.assertRaises(RuleConfigError):
+            RuleEngine({"suitability": {"rules": [{"name": "bad", "when": {"max_stars": 1}}]}})
+        with self.assertRaises(RuleConfigError):
+            RuleEngine({"explanation": {"rules": [{"name": "silent", "when": {"min_stars": 1}}]}})
+
+
+class StubEnrichmentSource:
+    """Local stand-in for the GitHub enrichment source"""
+
+    def __init__(self, shas, delay=0.0):
+        self.shas = shas
+        self.delay = delay
+        self.fetched = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def head_sha(self, full_name):
+        return self.shas[full_name]
+
+    def fetch(self, full_name, head_sha):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.fetched.append(full_name)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return EnrichmentData(
+            head_sha=head_sha,
+            readme=f"# {full_name}\nImplements the Agent Payments Protocol.",
+            pushed_at=datetime.now(timezone.utc) - timedelta(days=3),
+            open_issues=7,
+        )
+
+
+class TestEnrichment(unittest.TestCase):
+    """Test cases for the README and activity enrichment stage"""
+
+    def setUp(self):
+        """Set up repositories and a stub enrichment source"""
+        self.repos = [
+            RepositoryData(name=f"example/repo-{i}", rating=1, url=f"https://github.com/example/repo-{i}",
+                           topics=['utility'], language="C", stars=1)
+            for i in range(6)
+        ]
+        self.source = StubEnrichmentSource({repo.name: f"sha-{i}" for i, repo in enumerate(self.repos)})
+
+    def _monitor(self, storage=None):
+        monitor = AP2Monitor(storage=storage, enrichment_source=self.source)
+        for repo in self.repos:
+            monitor.add_repository(repo)
+        return monitor
+
+    def test_enrichment_attaches_signals(self):
+        """Test enrichment fills README and activity fields"""
+        monitor = self._monitor()
+        self.assertEqual(monitor.enrich_repositories(), 6)
+
+        repo = monitor.repositories[0]
+        self.assertEqual(repo.head_sha, "sha-0")
+        self.assertIn("Agent Payments Protocol", repo.readme)
+        self.assertEqual(repo.open_issues, 7)
+        self.assertIsNotNone(repo.pushed_at)
+
+    def test_enrichment_feeds_suitability(self):
+        """Test README and recent activity count as DWS IQ criteria"""
+        monitor = self._monitor()
+        self.assertFalse(monitor._assess_dws_iq_suitability(self.repos[0]))
+
+        monitor.enrich_repositories()
+        self.assertTrue(monitor._assess_dws_iq_suitability(self.repos[0]))
+
+    def test_unchanged_repositories_skipped(self):
+        """Test repositories with an unchanged head SHA are not fetched again"""
+        monitor = self._monitor()
+        monitor.enrich_repositories()
+        self.source.shas["example/repo-2"] = "sha-new"
+
+        self.assertEqual(monitor.enrich_repositories(), 1)
+        self.assertEqual(self.source.fetched.count("example/repo-2"), 2)
+        self.assertEqual(len(self.source.fetched), 7)
+
+    def test_concurrency_is_bounded(self):
+        """Test fetches run concurrently but never above max_workers"""
+        self.source.delay = 0.05
+        monitor = self._monitor()
+        monitor.enrich_repositories(max_workers=2)
+        self.assertEqual(self.source.max_active, 2)
+
+    def test_readme_keywords_match_whole_words(self):
+        """Test short README keywords do not match inside hashes, URLs or other words"""
+        engine = RuleEngine({"suitability": {"min_criteria": 1, "rules": [
+            {"name": "ap2_readme", "when": {"readme_any": ["ap2", "a2a"]}}]}})
+        repo = self.repos[0]
+
+        repo.readme = "commit 9fa2a1c, badge https://img.shields.io/snap2x and map2d helpers"
+        self.assertFalse(engine.is_suitable(repo))
+
+        repo.readme = "Implements AP2 mandates and the A2A transport."
+        self.assertTrue(engine.is_suitable(repo))
+
+    def test_search_payload_supplies_activity(self):
+        """Test last push and open issues come from search results, not extra requests"""
+        pushed_at = datetime(2025, 5, 1, tzinfo=timezone.utc)
+        source = Mock()
+        source.full_name = "example/agent"
+        source.html_url = "https://github.com/example/agent"
+        source.description = ""
+        source.topics = []
+        source.language = "Go"
+        source.stargazers_count = 10
+        source.forks_count = 1
+        source.pushed_at = pushed_at
+        source.open_issues_count = 4
+
+        repo = AP2Monitor()._repository_from_source(source)
+        self.assertEqual((repo.pushed_at, repo.open_issues), (pushed_at, 4))
+
+        client = Mock()
+        client.get_repo.return_value.get_readme.return_value.decoded_content = b"# Agent"
+        data = GitHubEnrichmentSource(client).fetch("example/agent", "sha-1")
+        client.get_repo.assert_called_once_with("example/agent", lazy=True)
+        self.assertEqual((data.readme, data.pushed_at, data.open_issues), ("# Agent", None, None))
+
+        monitor = AP2Monitor(enrichment_source=Mock(head_sha=Mock(return_value="sha-1"),
+                                                    fetch=Mock(return_value=data)))
+        monitor.add_repository(repo)
+        monitor.enrich_repositories()
+        self.assertEqual((repo.readme, repo.pushed_at, repo.open_issues), ("# Agent", pushed_at, 4))
+
+    def test_failing_repository_skipped(self):
+        """Test one failing lookup does not discard the other repositories' signals"""
+        original_fetch = self.source.fetch
+
+        def flaky_fetch(full_name, head_sha):
+            if full_name == "example/repo-3":
+                raise ConnectionError("connection reset")
+            return original_fetch(full_name, head_sha)
+
+        self.source.fetch = flaky_fetch
+        monitor = self._monitor()
+        self.assertEqual(monitor.enrich_repositories(), 5)
+        self.assertEqual(monitor.repositories[3].readme, "")
+        self.assertIn("Agent Payments Protocol", monitor.repositories[4].readme)
+
+    @patch('monitor.AP2Monitor.save_reports')
+    @patch('monitor.AP2Monitor.enrich_repositories')
+    @patch('monitor.AP2Monitor.fetch_repositories', return_value=[])
+    def test_cli_fetch_runs_enrichment(self, mock_fetch, mock_enrich, mock_save):
+        """Test the CLI sweep enriches repositories unless --no-enrich is given"""
+        monitor.main(["--fetch"])
+        mock_fetch.assert_called_once()
+        mock_enrich.assert_called_once()
+
+        mock_enrich.reset_mock()
+        monitor.main(["--fetch", "--no-enrich"])
+        mock_enrich.assert_not_called()
+
+    @patch('monitor.AP2Monitor.save_reports')
+    @patch('monitor.AP2Monitor.enrich_repositories')
+    def test_cli_db_enables_storage(self, mock_enrich, mock_save):
+        """Test --db and AP2_DB give CLI sweeps a SQLite storage that is closed at exit"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(AP2Monitor, 'fetch_repositories', autospec=True, return_value=[]) as mock_fetch:
+            path = os.path.join(tmp, "history.db")
+            monitor.main(["--fetch", "--db", path])
+            with patch.dict(os.environ, {"AP2_DB": path}):
+                monitor.main(["--fetch"])
+
+            for call in mock_fetch.call_args_list:
+                storage = call.args[0].storage
+                self.assertEqual(storage.path, path)
+                with self.assertRaises(sqlite3.ProgrammingError):
+                    storage.connection.execute("SELECT 1")
+
+    def test_cache_persisted_in_storage(self):
+        """Test a new monitor reuses enrichment stored by a previous run"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "monitor.db")
+            storage = SQLiteStorage(path)
+            self._monitor(storage).enrich_repositories()
+            storage.close()
+
+            storage = SQLiteStorage(path)
+            monitor = self._monitor(storage)
+            self.assertEqual(monitor.enrich_repositories(), 0)
+            self.assertIn("Agent Payments Protocol", monitor.repositories[0].readme)
+            storage.close()
+
+
+class FakeSearchResults:
+    """Search results that record the requested slice and can fail mid-iteration"""
+
+    def __init__(self, repos, fail_at=None, error=KeyboardInterrupt, failures=None):
+        self.repos = repos
+        self.fail_at = fail_at
+        self.error = error
+        self.failures = failures
+        self.requested = None
+
+    def __getitem__(self, key):
+        self.requested = key
+        return self._iterate(key)
+
+    def _iterate(self, key):
+        for position, repo in enumerate(self.repos[key], start=key.start or 0):
+            if position == self.fail_at and self.failures != 0:
+                if self.failures is not None:
+                    self.failures -= 1
+                raise self.error("sweep interrupted")
+            yield repo
+
+
+def make_search_repo(keyword, i):
+    repo = Mock()
+    repo.html_url = f"https://github.com/example/{keyword}-{i}"
+    repo.full_name = f"example/{keyword}-{i}"
+    repo.description = f"{keyword} project"
+    repo.topics = [keyword]
+    repo.language = 'Python'
+    repo.stargazers_count = 100
+    repo.forks_count = 1
+    return repo
+
+
+@patch('monitor.CHECKPOINT_PAGE_SIZE', 2)
+@patch('monitor.GithubException', new=Exception)
+class TestCheckpointedSweep(unittest.TestCase):
+    """Test cases for checkpointed and resumable keyword sweeps"""
+
+    def setUp(self):
+        """Set up a checkpoint location and fake search results"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sweep.json")
+        self.repos = {keyword: [make_search_repo(keyword, i) for i in range(6)] for keyword in ("a", "b", "c")}
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def _monitor(self, mock_github, results):
+        client = Mock()
+        client.search_repositories.side_effect = lambda query, **kwargs: results[query.split()[0]]
+        mock_github.return_value = client
+        return AP2Monitor(github_token="fake-token"), client
+
+    @patch('monitor.Github')
+    def test_resume_after_crash(self, mock_github):
+        """Test a crashed sweep resumes at the last completed page"""
+        crashing = {"a": FakeSearchResults(self.repos["a"]), "b": FakeSearchResults(self.repos["b"], fail_at=5)}
+        monitor, _ = self._monitor(mock_github, crashing)
+        with self.assertRaises(KeyboardInterrupt):
+            monitor.fetch_repositories(["a", "b"], checkpoint_path=self.path)
+
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        self.assertEqual(state["completed_keywords"], ["a"])
+        self.assertEqual((state["current_keyword"], state["current_offset"]), ("b", 4))
+        self.assertEqual(len(state["repositories"]), 10)
+        self.assertEqual(os.listdir(self.tmp.name), ["sweep.json"])
+
+        healthy = {"a": FakeSearchResults(self.repos["a"]), "b": FakeSearchResults(self.repos["b"])}
+        monitor, client = self._monitor(mock_github, healthy)
+        monitor.fetch_repositories(["a", "b"], checkpoint_path=self.path, resume=True)
+
+        self.assertEqual(client.search_repositories.call_count, 1)
+        self.assertEqual(healthy["b"].requested, slice(4, 10))
+        self.assertEqual(len(monitor.repositories), 12)
+        self.assertEqual(len({repo.url for repo in monitor.repositories}), 12)
+        self.assertFalse(os.path.exists(self.path))
+
+    def _healthy_results(self):
+        return {keyword: FakeSearchResults(repos) for keyword, repos in self.repos.items()}
+
+    def test_cli_checkpoint_arguments_validated(self):
+        """Test --resume needs --checkpoint and --checkpoint needs --fetch"""
+        for argv in (["--fetch", "--resume"], ["--checkpoint", self.path]):
+            with patch('sys.stderr'), self.assertRaises(SystemExit) as raised:
+                monitor.main(argv)
+            self.assertEqual(raised.exception.code, 2)
+
+    @patch('monitor.AP2Monitor.save_reports')
+    @patch('monitor.AP2Monitor.enrich_repositories')
+    @patch('monitor.AP2Monitor.fetch_repositories', return_value=["b"])
+    def test_cli_exits_non_zero_when_unfinished(self, mock_fetch, mock_enrich, mock_save):
+        """Test the CLI saves the partial report but exits with status 1"""
+        with patch('sys.stderr'), self.assertRaises(SystemExit) as raised:
+            monitor.main(["--fetch", "--checkpoint", self.path])
+        self.assertEqual(raised.exception.code, 1)
+        mock_save.assert_called_once()
+
+    def _searched(self, client):
+        return [call.kwargs["query"].split()[0] for call in client.search_repositories.call_args_list]
+
+    @patch('monitor.Github')
+    def test_transient_keyword_error_retried(self, mock_github):
+        """Test a keyword failing once is retried within the same sweep"""
+        results = self._healthy_results()
+        results["b"] = FakeSearchResults(self.repos["b"], fail_at=0, error=Exception, failures=1)
+        monitor, client = self._monitor(mock_github, results)
+        unfinished = monitor.fetch_repositories(["a", "b", "c"], checkpoint_path=self.path)
+
+        self.assertEqual(unfinished, [])
+        self.assertEqual(self._searched(client), ["a", "b", "b", "c"])
+        self.assertEqual(len(monitor.repositories), 18)
+        self.assertFalse(os.path.exists(self.path))
+
+    @patch('monitor.Github')
+    def test_persistent_keyword_error_skipped(self, mock_github):
+        """Test a keyword that always fails is skipped after bounded retries and the sweep completes"""
+        results = self._healthy_results()
+        results["b"] = FakeSearchResults(self.repos["b"], fail_at=0, error=Exception)
+        monitor, client = self._monitor(mock_github, results)
+        monitor.storage = Mock()
+        monitor.storage.star_growth_rates.return_value = {}
+        unfinished = monitor.fetch_repositories(["a", "b", "c"], checkpoint_path=self.path)
+
+        self.assertEqual(unfinished, [])
+        self.assertEqual(self._searched(client), ["a"] + ["b"] * KEYWORD_MAX_ATTEMPTS + ["c"])
+        monitor.storage.record_sweep.assert_called_once()
+        self.assertFalse(os.path.exists(self.path))
+
+    @patch('monitor.Github')
+    def test_keyword_attempts_survive_resume(self, mock_github):
+        """Test failed attempts are kept in the checkpoint so a resumed sweep stays bounded"""
+        errors = iter([Exception, KeyboardInterrupt])
+        results = self._healthy_results()
+        results["b"] = FakeSearchResults(self.repos["b"], fail_at=0,
+                                         error=lambda message: next(errors)(message))
+        monitor, _ = self._monitor(mock_github, results)
+        with self.assertRaises(KeyboardInterrupt):
+            monitor.fetch_repositories(["a", "b", "c"], checkpoint_path=self.path)
+
+        checkpoint = SweepCheckpoint(self.path)
+        self.assertTrue(checkpoint.load())
+        self.assertEqual((checkpoint.completed_keywords, checkpoint.keyword_attempts), (["a"], {"b": 1}))
+
+        results = self._healthy_results()
+        results["b"] = FakeSearchResults(self.repos["b"], fail_at=0, error=Exception)
+        monitor, client = self._monitor(mock_github, results)
+        unfinished = monitor.fetch_repositories(["a", "b", "c"], checkpoint_path=self.path, resume=True)
+
+        self.assertEqual(unfinished, [])
+        self.assertEqual(self._searched(client), ["b"] * (KEYWORD_MAX_ATTEMPTS - 1) + ["c"])
+
+    @patch('monitor.Github')
+    def test_rate_limit_stops_sweep(self, mock_github):
+        """Test a rate limit stops the sweep and leaves the rest for resume"""
+        results = self._healthy_results()
+        results["b"] = FakeSearchResults(
+            self.repos["b"], fail_at=0,
+            error=lambda message: RateLimitExceededException(403, {"message": message}, {}))
+        monitor, client = self._monitor(mock_github, results)
+        unfinished = monitor.fetch_repositories(["a", "b", "c"], checkpoint_path=self.path)
+
+        self.assertEqual(unfinished, ["b", "c"])
+        searched = self._searched(client)
+        self.assertEqual(searched, ["a", "b"])
+        self.assertTrue(os.path.exists(self.path))
+
+        monitor, client = self._monitor(mock_github, self._healthy_results())
+        monitor.fetch_repositories(["a", "b", "c"], checkpoint_path=self.path, resume=True)
+        searched = self._searched(client)
+        self.assertEqual(searched, ["b", "c"])
+
+    @patch('monitor.Github')
+    def test_resume_rejects_different_sweep(self, mock_github):
+        """Test resuming with other keywords raises instead of mixing sweeps"""
+        checkpoint = SweepCheckpoint(self.path)
+        checkpoint.start(["a"], 10)
+        checkpoint.save()
+
+        monitor, _ = self._monitor(mock_github, {})
+        with self.assertRaises(ValueError):
+            monitor.fetch_repositories(["a", "b"], checkpoint_path=self.path, resume=True)
+
+
+class FakeGitHub:
+    """Deterministic GitHub client usable from forked worker processes"""
+
+    def __init__(self, token=None):
+        self.token = token
+
+    def search_repositories(self, query, sort, order):
+        keyword = query.split()[0]
+        window = query.split()[-1] if query.count(" ") > 1 else "all"
+        names = [f"{keyword}-{window}", f"{keyword}-{window}-extra", "shared"]
+        results = []
+        for name in names:
+            repo = Mock()
+            repo.html_url = f"https://github.com/example/{name}"
+            repo.full_name = f"example/{name}"
+            repo.description = f"{keyword} project"
+            repo.topics = [keyword]
+            repo.language = 'Go'
+            repo.stargazers_count = 600
+            repo.forks_count = 2
+            results.append(repo)
+        return results
+
+
+class TestDistributedSweep(unittest.TestCase):
+    """Test cases for the sharded work queue sweep"""
+
+    def setUp(self):
+        """Create a queue database in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "queue.db")
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def test_enqueue_partitions_keywords_and_windows(self):
+        """Test one task is created per keyword and search window"""
+        queue = WorkQueue(self.path)
+        self.assertEqual(queue.enqueue(["ai", "cloud"], 5, ["stars:>=1000", "stars:<1000"]), 4)
+        task = queue.claim("w1")
+        self.assertEqual((task.keyword, task.search_window, task.per_keyword_limit), ("ai", "stars:>=1000", 5))
+        self.assertEqual(queue.progress(), {"pending": 3, "leased": 1, "done": 0, "failed": 0})
+        queue.close()
+
+    def test_expired_lease_reclaimed_and_failures_capped(self):
+        """Test abandoned tasks are re-leased and repeated failures stop retrying"""
+        queue = WorkQueue(self.path, lease_seconds=-1, max_attempts=2)
+        queue.enqueue(["ai"])
+        first = queue.claim("crashed-worker")
+        second = queue.claim("w2")
+        self.assertEqual((second.id, second.attempts), (first.id, 2))
+
+        queue.fail(second, "rate limited")
+        self.assertIsNone(queue.claim("w3"))
+        self.assertEqual(queue.progress()["failed"], 1)
+        self.assertTrue(queue.is_finished())
+        queue.close()
+
+    def test_expired_lease_capped_at_max_attempts(self):
+        """Test a task that keeps killing its worker fails after max_attempts leases"""
+        queue = WorkQueue(self.path, lease_seconds=-1, max_attempts=2)
+        queue.enqueue(["ai"])
+        attempts = []
+        for worker in ("w1", "w2", "w3"):
+            task = queue.claim(worker)
+            attempts.append(task.attempts if task else None)
+
+        self.assertEqual(attempts, [1, 2, None])
+        self.assertEqual(queue.progress()["failed"], 1)
+        self.assertTrue(queue.is_finished())
+        queue.close()
+
+    def test_worker_survives_unexpected_errors(self):
+        """Test non-GitHub errors fail the task and the worker moves on"""
+        class BrokenGitHub(FakeGitHub):
+            def search_repositories(self, query, sort, order):
+                if query.startswith("bad "):
+                    raise ValueError("malformed payload")
+                return super().search_repositories(query, sort, order)
+
+        queue = WorkQueue(self.path, max_attempts=2)
+        queue.enqueue(["bad", "ai"])
+        self.assertEqual(run_worker(self.path, worker_id="w1", github_client=BrokenGitHub()), 1)
+
+        self.assertEqual(queue.progress(), {"pending": 0, "leased": 0, "done": 1, "failed": 1})
+        error = queue.connection.execute("SELECT error FROM tasks WHERE keyword = 'bad'").fetchone()[0]
+        self.assertIn("malformed payload", error)
+        queue.close()
+
+    def test_rate_limited_worker_releases_task_and_stops(self):
+        """Test a long rate limit hands the task back without using up an attempt"""
+        class RateLimitedGitHub(FakeGitHub):
+            def search_repositories(self, query, sort, order):
+                raise RateLimitExceededException(403, {"message": "API rate limit exceeded"},
+                                                 {"x-ratelimit-reset": str(time.time() + 3600)})
+
+        queue = WorkQueue(self.path, max_attempts=1)
+        queue.enqueue(["ai", "cloud"])
+        self.assertEqual(run_worker(self.path, worker_id="w1", github_client=RateLimitedGitHub(),
+                                    rate_limit_max_wait=60), 0)
+
+        self.assertEqual(queue.progress(), {"pending": 2, "leased": 0, "done": 0, "failed": 0})
+        attempts = [row[0] for row in queue.connection.execute("SELECT attempts FROM tasks")]
+        self.assertEqual(attempts, [0, 0])
+        queue.close()
+
+    @patch('monitor.time.sleep')
+    def test_rate_limited_worker_waits_for_reset(self, mock_sleep):
+        """Test a short rate limit is waited out and the task retried"""
+        class RateLimitedOnceGitHub(FakeGitHub):
+            limited = False
+
+            def search_repositories(self, query, sort, order):
+                if not self.limited:
+                    self.limited = True
+                    raise RateLimitExceededException(403, {"message": "secondary rate limit"}, {"retry-after": "5"})
+                return super().search_repositories(query, sort, order)
+
+        queue = WorkQueue(self.path, max_attempts=1)
+        queue.enqueue(["ai"])
+        self.assertEqual(run_worker(self.path, worker_id="w1", github_client=RateLimitedOnceGitHub()), 1)
+
+        mock_sleep.assert_called_once_with(5.0)
+        self.assertEqual(queue.progress()["done"], 1)
+        queue.close()
+
+    @patch('monitor.WORK_QUEUE_POLL_SECONDS', 0.05)
+    def test_worker_started_before_enqueue_waits_for_tasks(self):
+        """Test an external worker polls an empty queue until the coordinator enqueues"""
+        queue = WorkQueue(self.path)
+        completed = []
+        worker = threading.Thread(
+            target=lambda: completed.append(run_worker(self.path, worker_id="w1", github_client=FakeGitHub()))
+        )
+        worker.start()
+        time.sleep(0.2)
+        self.assertTrue(worker.is_alive())
+
+        queue.enqueue(["ai", "cloud"])
+        worker.join(timeout=10)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(completed, [2])
+        queue.close()
+
+    @patch('monitor.WORK_QUEUE_POLL_SECONDS', 0.05)
+    @patch('monitor.WORK_QUEUE_LEASE_SECONDS', 0.5)
+    def test_distributed_sweep_recovers_crashed_worker_lease(self):
+        """Test a task leased by a crashed worker is re-run by a restarted worker"""
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("worker processes need to inherit the fake GitHub client")
+
+        marker = os.path.join(self.tmp.name, "crashed")
+
+        class CrashingGitHub(FakeGitHub):
+            def search_repositories(self, query, sort, order):
+                if query.startswith("cloud ") and not os.path.exists(marker):
+                    open(marker, "w").close()
+                    os._exit(1)
+                return super().search_repositories(query, sort, order)
+
+        with patch('monitor.Github', new=CrashingGitHub):
+            monitor = distributed_sweep(self.path, ["ai", "cloud", "api"], processes=1)
+
+        self.assertTrue(os.path.exists(marker))
+        queue = WorkQueue(self.path)
+        self.assertEqual(queue.progress()["done"], 3)
+        attempts = queue.connection.execute("SELECT attempts FROM tasks WHERE keyword = 'cloud'").fetchone()[0]
+        self.assertEqual(attempts, 2)
+        self.assertEqual(len(monitor.repositories), 3 * 2 + 1)
+        queue.close()
+
+    def test_distributed_sweep_rejects_used_queue(self):
+        """Test a queue holding an earlier sweep is not reused"""
+        queue = WorkQueue(self.path)
+        queue.enqueue(["ai"])
+        queue.close()
+
+        with self.assertRaises(ValueError):
+            distributed_sweep(self.path, ["cloud"])
+
+    @patch('monitor.GithubException', new=Exception)
+    def test_worker_results_merged_with_dedupe(self):
+        """Test worker results merge into one URL-deduplicated list"""
+        queue = WorkQueue(self.path)
+        queue.enqueue(["ai", "cloud"])
+        self.assertEqual(run_worker(self.path, worker_id="w1", github_client=FakeGitHub()), 2)
+
+        urls = [repo.url for repo in queue.merged_repositories()]
+        self.assertEqual(len(urls), 5)
+        self.assertEqual(len(set(urls)), 5)
+        queue.close()
+
+    @patch('monitor.WORK_QUEUE_POLL_SECONDS', 0.05)
+    @patch('monitor.Github', new=FakeGitHub)
+    def test_distributed_sweep_with_local_processes(self):
+        """Test the coordinator shards keywords across local worker processes"""
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("worker processes need to inherit the fake GitHub client")
+
+        keywords = ["ai", "cloud", "api", "web"]
+        monitor = distributed_sweep(self.path, keywords, search_windows=["stars:>=1000", "stars:<1000"],
+                                    tokens=["token-a", "token-b"], processes=3)
+
+        self.assertEqual(len(monitor.repositories), len(keywords) * 2 * 2 + 1)
+        self.assertEqual(len({repo.url for repo in monitor.repositories}), len(monitor.repositories))
+
+        queue = WorkQueue(self.path)
+        self.assertEqual(queue.progress()["done"], 8)
+        workers = {row[0] for row in queue.connection.execute("SELECT worker FROM tasks")}
+        self.assertTrue(workers.issubset({"local-0", "local-1", "local-2"}))
+        queue.close()
+
+    @patch('monitor.WORK_QUEUE_POLL_SECONDS', 0.05)
+    @patch('monitor.Github', new=FakeGitHub)
+    def test_distributed_sweep_applies_growth_rates(self):
+        """Test merged repositories are rated with the coordinator's star growth"""
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("worker processes need to inherit the fake GitHub client")
+
+        storage = SQLiteStorage(os.path.join(self.tmp.name, "history.db"))
+        growing = RepositoryData(name="example/ai-all", rating=1, url="https://github.com/example/ai-all",
+                                 stars=100)
+        now = datetime.now(timezone.utc)
+        storage.record_sweep([growing], observed_at=now - timedelta(days=2))
+        growing.stars = 600
+        storage.record_sweep([growing], observed_at=now - timedelta(days=1))
+
+        monitor = distributed_sweep(self.path, ["ai"], processes=1, monitor=AP2Monitor(storage=storage))
+        ratings = {repo.url: repo.rating for repo in monitor.repositories}
+        self.assertEqual(ratings["https://github.com/example/ai-all"], 3)
+        self.assertEqual(ratings["https://github.com/example/shared"], 2)
+        storage.close()
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    """Test cases for the SQLite storage backend"""
+
+    def setUp(self):
+        """Create a storage file in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(os.path.join(self.tmp.name, "monitor.db"))
+        self.repo = RepositoryData(
+            name="example/agent", rating=2, url="https://github.com/example/agent",
+            description="Agent payments", topics=['ai', 'payments'],
+            language="Python", stars=100, forks=10,
+        )
+
+    def tearDown(self):
+        """Close the storage and remove the temporary directory"""
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode_enabled(self):
+        """Test the database uses WAL journaling"""
+        mode = self.storage.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_record_sweep_upserts_repositories(self):
+        """Test repeated sweeps update one repository row and append observations"""
+        first = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.storage.record_sweep([self.repo], observed_at=first)
+        self.repo.stars = 400
+        self.storage.record_sweep([self.repo], observed_at=first + timedelta(days=10))
+
+        loaded = self.storage.load_repositories()
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].stars, 400)
+        self.assertEqual(loaded[0].topics, ['ai', 'payments'])
+        self.assertEqual([row[1] for row in self.storage.star_history(self.repo.url)], [100, 400])
+
+    def test_star_growth_rates(self):
+        """Test growth rate is stars per day within the window"""
+        now = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        self.storage.record_sweep([self.repo], observed_at=now - timedelta(days=100))
+        self.repo.stars = 200
+        self.storage.record_sweep([self.repo], observed_at=now - timedelta(days=20))
+        self.repo.stars = 400
+        self.storage.record_sweep([self.repo], observed_at=now)
+
+        rates = self.storage.star_growth_rates(days=30, now=now)
+        self.assertAlmostEqual(rates[self.repo.url], 10.0)
+
+    def test_single_observation_has_no_growth_rate(self):
+        """Test repositories need two observations for a growth rate"""
+        self.storage.record_sweep([self.repo])
+        self.assertEqual(self.storage.star_growth_rates(), {})
+
+    @patch('monitor.GithubException', new=Exception)
+    @patch('monitor.Github')
+    def test_fetch_records_sweep_and_uses_growth(self, mock_github):
+        """Test fetch_repositories stores a sweep and boosts fast-growing repositories"""
+        now = datetime.now(timezone.utc)
+        self.storage.record_sweep([self.repo], observed_at=now - timedelta(days=2))
+        self.repo.stars = 300
+        self.storage.record_sweep([self.repo], observed_at=now - timedelta(days=1))
+
+        mock_repo = Mock()
+        mock_repo.html_url = self.repo.url
+        mock_repo.full_name = self.repo.name
+        mock_repo.description = self.repo.description
+        mock_repo.topics = self.repo.topics
+        mock_repo.language = 'Python'
+        mock_repo.stargazers_count = 300
+        mock_repo.forks_count = 10
+        mock_client = Mock()
+        mock_client.search_repositories.return_value = [mock_repo]
+        mock_github.return_value = mock_client
+
+        monitor = AP2Monitor(github_token="fake-token", storage=self.storage)
+        monitor.fetch_repositories(['ai'], per_keyword_limit=1)
+
+        self.assertEqual(monitor.repositories[0].rating, 2)
+        self.assertEqual(len(self.storage.star_history(self.repo.url)), 3)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file